@@ -1,3 +1,3 @@
 """ETF 数据 FastAPI 服务包。"""
 
-__all__ = ["config", "db", "deps"]
+__all__ = ["cache", "config", "db", "deps"]
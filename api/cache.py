@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import logging
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+
+try:
+    from redis import asyncio as redis_asyncio
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - optional dependency
+    redis_asyncio = None
+    RedisError = OSError
+
+from .config import Settings, settings
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """基于 Redis 的接口响应缓存；未配置 REDIS_URL 时直接透传。"""
+
+    def __init__(self, config: Settings) -> None:
+        self._config = config
+        self._client: Optional["redis_asyncio.Redis"] = None
+
+    async def connect(self) -> None:
+        if self._client is not None or not self._config.redis_url:
+            return
+        if redis_asyncio is None:
+            LOGGER.warning("REDIS_URL is set but the redis package is not installed; response cache disabled.")
+            return
+        self._client = redis_asyncio.from_url(self._config.redis_url)
+
+    async def close(self) -> None:
+        if self._client is None:
+            return
+        await self._client.aclose()
+        self._client = None
+
+    async def ping(self) -> Optional[bool]:
+        """未启用缓存时返回 None。"""
+        if self._client is None:
+            return None
+        try:
+            return bool(await self._client.ping())
+        except RedisError as exc:
+            LOGGER.warning("Redis PING failed: %s", exc)
+            return False
+
+    async def cached(
+        self,
+        key: str,
+        ttl: int,
+        build: Callable[[], Awaitable[BaseModel]],
+    ) -> Response:
+        """命中时直接返回缓存的 JSON 字节；未命中时执行 build 并写回缓存。"""
+        if self._client is not None:
+            try:
+                payload = await self._client.get(key)
+            except RedisError as exc:
+                LOGGER.warning("Redis GET failed for %s: %s", key, exc)
+                payload = None
+            if payload is not None:
+                return Response(content=payload, media_type="application/json")
+
+        model = await build()
+        payload = model.model_dump_json(by_alias=True).encode("utf-8")
+
+        if self._client is not None:
+            try:
+                await self._client.setex(key, ttl, payload)
+            except RedisError as exc:
+                LOGGER.warning("Redis SETEX failed for %s: %s", key, exc)
+
+        return Response(content=payload, media_type="application/json")
+
+
+cache = ResponseCache(settings)
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
 
 try:
@@ -26,19 +27,31 @@ def _split_csv(value: str) -> tuple[str, ...]:
 
 @dataclass(frozen=True)
 class Settings:
-    pg_host: str = _get_env("PGHOST")
-    pg_port: int = int(_get_env("PGPORT", "5432"))
-    pg_database: str = _get_env("PGDATABASE")
-    pg_user: str = _get_env("PGUSER")
-    pg_password: str = _get_env("PGPASSWORD")
-    pg_pool_min_size: int = int(os.getenv("PGPOOL_MIN_SIZE", "1"))
-    pg_pool_max_size: int = int(os.getenv("PGPOOL_MAX_SIZE", "5"))
-    api_auth_token: Optional[str] = os.getenv("API_AUTH_TOKEN")
-    default_return_years: int = int(os.getenv("ETF_DEFAULT_RETURN_YEARS", "10"))
-    default_benchmark_symbol: str = os.getenv("ETF_DEFAULT_BENCHMARK", "SPY.US")
-    api_cors_origins: tuple[str, ...] = _split_csv(
-        os.getenv("API_CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173")
+    # 环境变量在实例化时读取，get_settings.cache_clear() 后即可按新的环境重建配置。
+    pg_host: str = field(default_factory=lambda: _get_env("PGHOST"))
+    pg_port: int = field(default_factory=lambda: int(_get_env("PGPORT", "5432")))
+    pg_database: str = field(default_factory=lambda: _get_env("PGDATABASE"))
+    pg_user: str = field(default_factory=lambda: _get_env("PGUSER"))
+    pg_password: str = field(default_factory=lambda: _get_env("PGPASSWORD"))
+    pg_pool_min_size: int = field(default_factory=lambda: int(os.getenv("PGPOOL_MIN_SIZE", "10")))
+    pg_pool_max_size: int = field(default_factory=lambda: int(os.getenv("PGPOOL_MAX_SIZE", "20")))
+    pg_pool_max_inactive_lifetime: float = field(
+        default_factory=lambda: float(os.getenv("PGPOOL_MAX_INACTIVE_LIFETIME", "600"))
     )
+    pg_command_timeout: float = field(default_factory=lambda: float(os.getenv("PG_COMMAND_TIMEOUT", "30")))
+    pg_statement_cache_size: int = field(
+        default_factory=lambda: int(os.getenv("PG_STATEMENT_CACHE_SIZE", "1024"))
+    )
+    api_auth_token: Optional[str] = field(default_factory=lambda: os.getenv("API_AUTH_TOKEN"))
+    redis_url: Optional[str] = field(default_factory=lambda: os.getenv("REDIS_URL"))
+    default_return_years: int = field(default_factory=lambda: int(os.getenv("ETF_DEFAULT_RETURN_YEARS", "10")))
+    default_benchmark_symbol: str = field(default_factory=lambda: os.getenv("ETF_DEFAULT_BENCHMARK", "SPY.US"))
+    api_cors_origins: tuple[str, ...] = field(
+        default_factory=lambda: _split_csv(
+            os.getenv("API_CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173")
+        )
+    )
+    api_cors_origin_regex: Optional[str] = field(default_factory=lambda: os.getenv("API_CORS_ORIGIN_REGEX") or None)
 
     @property
     def postgres_dsn(self) -> str:
@@ -48,4 +61,10 @@ class Settings:
         )
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """进程内唯一的配置实例，可直接作为 FastAPI 依赖使用。"""
+    return Settings()
+
+
+settings = get_settings()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Optional
 
@@ -8,6 +10,19 @@ import asyncpg
 from .config import Settings, settings
 
 
+LOGGER = logging.getLogger(__name__)
+
+async def _init_connection(connection: asyncpg.Connection) -> None:
+    # 接口只输出浮点数，直接把 numeric 解码成 float，省去逐行构造 Decimal。
+    await connection.set_type_codec(
+        "numeric",
+        encoder=str,
+        decoder=float,
+        schema="pg_catalog",
+        format="text",
+    )
+
+
 class Database:
     def __init__(self, config: Settings) -> None:
         self._config = config
@@ -24,6 +39,10 @@ class Database:
             database=self._config.pg_database,
             min_size=self._config.pg_pool_min_size,
             max_size=self._config.pg_pool_max_size,
+            max_inactive_connection_lifetime=self._config.pg_pool_max_inactive_lifetime,
+            command_timeout=self._config.pg_command_timeout,
+            statement_cache_size=self._config.pg_statement_cache_size,
+            init=_init_connection,
         )
 
     async def close(self) -> None:
@@ -38,6 +57,16 @@ class Database:
             raise RuntimeError("Database pool is not initialized; call connect() first.")
         return self._pool
 
+    async def ping(self, timeout: float) -> bool:
+        """就绪探针：在 timeout 秒内借到连接并完成 SELECT 1 即视为可用。"""
+        try:
+            async with self.pool.acquire(timeout=timeout) as connection:
+                await connection.fetchval("SELECT 1", timeout=timeout)
+        except (asyncpg.PostgresError, OSError, RuntimeError, asyncio.TimeoutError) as exc:
+            LOGGER.warning("Database ping failed: %s", exc)
+            return False
+        return True
+
     @asynccontextmanager
     async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
         pool = self.pool
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
+from .cache import cache
 from .config import settings
 from .db import db
 from .routers import etfs, industries
@@ -13,25 +17,36 @@ from .routers import etfs, industries
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await db.connect()
+    await cache.connect()
     try:
         yield
     finally:
+        await cache.close()
         await db.close()
 
 
+_READINESS_TIMEOUT = 2.0
+
+_ALLOW_ALL_ORIGINS = "*" in settings.api_cors_origins
+_ALLOW_ORIGINS = ["*"] if _ALLOW_ALL_ORIGINS else list(settings.api_cors_origins)
+
+
 app = FastAPI(title="ETF Data API", lifespan=lifespan)
 
-if settings.api_cors_origins:
-    allow_all_origins = any(origin == "*" for origin in settings.api_cors_origins)
-    allow_origins = ["*"] if allow_all_origins else list(settings.api_cors_origins)
+# 未携带 Origin 头的请求（如 /healthz、/readyz 探针）CORSMiddleware 会直接放行，不做额外处理。
+if _ALLOW_ORIGINS or settings.api_cors_origin_regex:
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=allow_origins,
-        allow_credentials=not allow_all_origins,
+        allow_origins=_ALLOW_ORIGINS,
+        allow_origin_regex=settings.api_cors_origin_regex,
+        allow_credentials=not _ALLOW_ALL_ORIGINS,
         allow_methods=["*"],
         allow_headers=["*"],
     )
 
+# 日度累计收益序列可达数百 KB，gzip 后约为原来的 1/5；小于 1 KB 的响应不压缩。
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 app.include_router(etfs.router, prefix="/api")
 app.include_router(industries.router, prefix="/api")
 
@@ -39,3 +54,16 @@ app.include_router(industries.router, prefix="/api")
 @app.get("/healthz", tags=["health"])
 async def health_check() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/readyz", tags=["health"])
+async def readiness_check() -> JSONResponse:
+    # 数据库不可用时返回 503；Redis 只是可选缓存，异常时仅在结果中标注。
+    database_ok, cache_ok = await asyncio.gather(db.ping(_READINESS_TIMEOUT), cache.ping())
+    payload = {
+        "status": "ok" if database_ok else "unavailable",
+        "database": "ok" if database_ok else "unavailable",
+        "cache": "disabled" if cache_ok is None else ("ok" if cache_ok else "unavailable"),
+    }
+    status_code = status.HTTP_200_OK if database_ok else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(payload, status_code=status_code)
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from decimal import Decimal
-from typing import Iterable, Optional
+import json
+from typing import AsyncIterator, Optional
 
 import asyncpg
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import numpy as np
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 
+from ..cache import cache
 from ..config import settings
-from ..deps import get_db_connection, verify_api_token
+from ..db import db
+from ..deps import verify_api_token
 from ..schemas import (
     PerformancePoint,
     PerformanceSeries,
@@ -17,12 +21,180 @@ from ..schemas import (
 )
 
 
-BUCKET_EXPRESSIONS = {
-    "day": "f.trade_date",
-    "month": "date_trunc('month', f.trade_date)::date",
-    "year": "date_trunc('year', f.trade_date)::date",
+PERIOD_TYPES = frozenset({"month", "year"})
+
+# mart_daily_quotes_bucketed 中预先计算好的分桶列，见 config/sql/mart_daily_quotes_bucketed.sql。
+BUCKET_COLUMNS = {
+    "day": "trade_date",
+    "month": "bucket_date_month",
+    "year": "bucket_date_year",
 }
 
+# 周期收益/统计来自每日刷新的 mart 表，累计收益对比的基准可变，缓存时间更短。
+_DAILY_MART_CACHE_TTL = 3600
+_PERFORMANCE_CACHE_TTL = 300
+
+# 客户端通过 Accept 头选择按行流式返回累计收益，服务端游标每批预取的行数。
+_NDJSON_MEDIA_TYPE = "application/x-ndjson"
+_STREAM_PREFETCH = 1000
+
+# SQL 文本保持为模块常量：文本稳定才能命中 asyncpg 按连接缓存的预编译语句。
+# 列顺序需与 _load_periodic_returns 中的按位解包保持一致。
+_SQL_PERIODIC_RETURNS = """
+    SELECT period_key,
+           period_start,
+           period_end,
+           trading_days,
+           total_return_pct,
+           compound_return_pct,
+           volatility_pct,
+           max_drawdown_pct
+    FROM mart_etf_periodic_returns
+    WHERE symbol = $1
+      AND period_type = $2
+    ORDER BY period_start DESC
+    LIMIT $3
+"""
+
+_SQL_PERFORMANCE_TEMPLATE = """
+    WITH symbol_bounds AS (
+        SELECT s.symbol,
+               (SELECT MIN(b.trade_date)
+                FROM mart_daily_quotes_bucketed b
+                WHERE b.symbol = s.symbol) AS min_date,
+               (SELECT MAX(b.trade_date)
+                FROM mart_daily_quotes_bucketed b
+                WHERE b.symbol = s.symbol) AS max_date
+        FROM unnest($1::text[]) AS s(symbol)
+    ),
+    available AS (
+        SELECT
+            MIN(max_date) AS end_date,
+            MAX(min_date) AS min_shared_date,
+            COUNT(min_date) AS symbol_count
+        FROM symbol_bounds
+    ),
+    range_bounds AS (
+        SELECT
+            end_date,
+            GREATEST(
+                (end_date - make_interval(years => $2))::date,
+                min_shared_date
+            ) AS start_date
+        FROM available
+        WHERE end_date IS NOT NULL
+          AND min_shared_date IS NOT NULL
+          AND symbol_count >= 2
+    ),
+    aggregated AS (
+        SELECT DISTINCT ON (b.symbol, b.{bucket_column})
+            b.symbol,
+            b.{bucket_column} AS bucket_date,
+            b.adjusted_close
+        FROM mart_daily_quotes_bucketed b
+        JOIN range_bounds rb
+          ON b.trade_date BETWEEN rb.start_date AND rb.end_date
+        WHERE b.symbol = ANY($1)
+        ORDER BY b.symbol, b.{bucket_column}, b.trade_date DESC
+    )
+    SELECT
+        bucket_date,
+        MAX(adjusted_close) FILTER (WHERE symbol = $3) AS etf_close,
+        MAX(adjusted_close) FILTER (WHERE symbol = $4) AS benchmark_close
+    FROM aggregated
+    GROUP BY bucket_date
+    HAVING COUNT(*) FILTER (WHERE symbol = $3) > 0
+       AND COUNT(*) FILTER (WHERE symbol = $4) > 0
+    ORDER BY bucket_date;
+"""
+
+_SQL_PERFORMANCE = {
+    interval_key: _SQL_PERFORMANCE_TEMPLATE.format(bucket_column=column)
+    for interval_key, column in BUCKET_COLUMNS.items()
+}
+
+_SQL_RETURN_STATS = """
+    WITH bounds AS (
+        SELECT
+            MIN(mdq.trade_date) AS min_trade_date,
+            MAX(mdq.trade_date) AS max_trade_date
+        FROM mart_daily_quotes mdq
+        WHERE mdq.symbol = $1
+    ),
+    range_bounds AS (
+        SELECT
+            max_trade_date,
+            GREATEST(
+                min_trade_date,
+                (max_trade_date - make_interval(years => $2))::date
+            ) AS start_cut
+        FROM bounds
+    ),
+    actual_bounds AS (
+        SELECT
+            (SELECT MIN(trade_date)
+             FROM mart_daily_quotes
+             WHERE symbol = $1
+               AND trade_date >= rb.start_cut) AS window_start,
+            rb.max_trade_date AS window_end
+        FROM range_bounds rb
+    ),
+    price_bounds AS (
+        SELECT
+            ab.window_start,
+            ab.window_end,
+            (SELECT adjusted_close
+             FROM mart_daily_quotes
+             WHERE symbol = $1
+               AND trade_date = ab.window_start) AS start_price,
+            (SELECT adjusted_close
+             FROM mart_daily_quotes
+             WHERE symbol = $1
+               AND trade_date = ab.window_end) AS end_price
+        FROM actual_bounds ab
+    ),
+    periods AS (
+        SELECT
+            r.period_key,
+            r.period_start,
+            r.period_end,
+            r.total_return_pct,
+            r.volatility_pct,
+            r.max_drawdown_pct,
+            COALESCE(NULLIF(r.compound_return_pct, 0), r.total_return_pct) AS period_return
+        FROM mart_etf_periodic_returns r
+        CROSS JOIN actual_bounds ab
+        WHERE r.symbol = $1
+          AND r.period_type = 'year'
+          AND ab.window_start IS NOT NULL
+          AND r.period_end >= ab.window_start
+          AND r.period_start <= ab.window_end
+    )
+    SELECT
+        pb.window_start,
+        pb.window_end,
+        pb.start_price,
+        pb.end_price,
+        COUNT(*) AS periods,
+        COUNT(p.period_return) AS valid_returns,
+        CASE
+            WHEN COUNT(p.period_return) = 0 THEN NULL
+            WHEN BOOL_OR(p.period_return <= -1) THEN 0
+            ELSE EXP(SUM(CASE WHEN p.period_return > -1 THEN LN(1 + p.period_return) END))
+        END AS compounded_growth,
+        AVG(p.volatility_pct) AS average_volatility,
+        MIN(p.max_drawdown_pct) AS max_drawdown,
+        ARRAY_AGG(p.period_key ORDER BY p.total_return_pct DESC, p.period_start)
+            FILTER (WHERE p.total_return_pct IS NOT NULL) AS ranked_period_keys,
+        MAX(p.total_return_pct) AS best_period_return,
+        MIN(p.total_return_pct) AS worst_period_return,
+        MIN(p.period_start) AS first_period_start,
+        MAX(p.period_end) AS last_period_end
+    FROM periods p
+    CROSS JOIN price_bounds pb
+    GROUP BY pb.window_start, pb.window_end, pb.start_price, pb.end_price
+"""
+
 
 router = APIRouter(
     prefix="/etfs",
@@ -31,64 +203,58 @@ router = APIRouter(
 )
 
 
-def _to_float(value: Optional[Decimal]) -> Optional[float]:
-    return float(value) if value is not None else None
-
-
-def _sort_records(records: Iterable[asyncpg.Record]) -> list[asyncpg.Record]:
-    return sorted(records, key=lambda row: row["period_start"])
-
-
 @router.get("/{symbol}/returns", response_model=ReturnSeries, summary="ETF 周期收益")
 async def get_periodic_returns(
     symbol: str,
     period: str = Query("year", description="统计周期：'month' 或 'year'"),
     limit: int = Query(10, ge=1, le=240, description="返回的周期数量"),
-    conn: asyncpg.Connection = Depends(get_db_connection),
-) -> ReturnSeries:
+) -> Response:
     period_type = period.lower()
-    if period_type not in {"month", "year"}:
+    if period_type not in PERIOD_TYPES:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="period 必须是 month 或 year")
 
-    rows = await conn.fetch(
-        """
-        SELECT period_key,
-               period_start,
-               period_end,
-               trading_days,
-               total_return_pct,
-               compound_return_pct,
-               volatility_pct,
-               max_drawdown_pct
-        FROM mart_etf_periodic_returns
-        WHERE symbol = $1
-          AND period_type = $2
-        ORDER BY period_start DESC
-        LIMIT $3
-        """,
-        symbol,
-        period_type,
-        limit,
+    return await cache.cached(
+        f"etf:returns:{symbol}:{period_type}:{limit}",
+        _DAILY_MART_CACHE_TTL,
+        lambda: _load_periodic_returns(symbol, period_type, limit),
     )
 
+
+async def _load_periodic_returns(
+    symbol: str,
+    period_type: str,
+    limit: int,
+) -> ReturnSeries:
+    async with db.acquire() as conn:
+        rows = await conn.fetch(_SQL_PERIODIC_RETURNS, symbol, period_type, limit)
+
     if not rows:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到该标的的收益数据")
 
     payload = [
-        PeriodicReturn(
-            period_key=row["period_key"],
-            period_start=row["period_start"],
-            period_end=row["period_end"],
-            trading_days=row["trading_days"],
-            total_return_pct=_to_float(row["total_return_pct"]),
-            compound_return_pct=_to_float(row["compound_return_pct"]),
-            volatility_pct=_to_float(row["volatility_pct"]),
-            max_drawdown_pct=_to_float(row["max_drawdown_pct"]),
+        PeriodicReturn.model_construct(
+            period_key=period_key,
+            period_start=period_start,
+            period_end=period_end,
+            trading_days=trading_days,
+            total_return_pct=total_return,
+            compound_return_pct=compound_return,
+            volatility_pct=volatility,
+            max_drawdown_pct=max_drawdown,
         )
-        for row in rows
+        for (
+            period_key,
+            period_start,
+            period_end,
+            trading_days,
+            total_return,
+            compound_return,
+            volatility,
+            max_drawdown,
+        ) in rows
     ]
 
-    return ReturnSeries(symbol=symbol, period=period_type, rows=payload)
+    return ReturnSeries.model_construct(symbol=symbol, period=period_type, rows=payload)
 
 
 @router.get(
@@ -112,126 +278,76 @@ async def get_performance_series(
         None,
         description="对比基准的 symbol，默认为 ETF_DEFAULT_BENCHMARK",
     ),
-    conn: asyncpg.Connection = Depends(get_db_connection),
-) -> PerformanceSeries:
+    accept: Optional[str] = Header(
+        default=None,
+        description=f"传入 {_NDJSON_MEDIA_TYPE} 时按行流式返回：首行为元信息，其后每行一个数据点",
+    ),
+) -> Response:
     interval_key = interval.lower()
-    if interval_key not in BUCKET_EXPRESSIONS:
+    query = _SQL_PERFORMANCE.get(interval_key)
+    if query is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="interval 必须是 day、month 或 year")
 
     benchmark_symbol = benchmark or settings.default_benchmark_symbol
     if benchmark_symbol == symbol:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="基准 symbol 不可与标的一致")
 
-    bucket_expr = BUCKET_EXPRESSIONS[interval_key]
-    query = f"""
-        WITH symbol_bounds AS (
-            SELECT symbol,
-                   MIN(trade_date) AS min_date,
-                   MAX(trade_date) AS max_date
-            FROM mart_daily_quotes
-            WHERE symbol = ANY($1)
-              AND adjusted_close IS NOT NULL
-              AND adjusted_close > 0
-            GROUP BY symbol
-        ),
-        available AS (
-            SELECT
-                MIN(max_date) AS end_date,
-                MAX(min_date) AS min_shared_date,
-                COUNT(*) AS symbol_count
-            FROM symbol_bounds
-        ),
-        range_bounds AS (
-            SELECT
-                end_date,
-                GREATEST(
-                    (end_date - make_interval(years => $2))::date,
-                    min_shared_date
-                ) AS start_date
-            FROM available
-            WHERE end_date IS NOT NULL
-              AND min_shared_date IS NOT NULL
-              AND symbol_count >= 2
-        ),
-        filtered AS (
-            SELECT mdq.symbol,
-                   mdq.trade_date,
-                   mdq.adjusted_close
-            FROM mart_daily_quotes mdq
-            JOIN range_bounds rb
-              ON mdq.trade_date BETWEEN rb.start_date AND rb.end_date
-            WHERE mdq.symbol = ANY($1)
-              AND mdq.adjusted_close IS NOT NULL
-              AND mdq.adjusted_close > 0
-        ),
-        bucketed AS (
-            SELECT
-                f.symbol,
-                {bucket_expr} AS bucket_date,
-                f.trade_date,
-                f.adjusted_close,
-                ROW_NUMBER() OVER (PARTITION BY f.symbol, {bucket_expr} ORDER BY f.trade_date DESC) AS rn_desc
-            FROM filtered f
-        ),
-        aggregated AS (
-            SELECT
-                symbol,
-                bucket_date,
-                adjusted_close
-            FROM bucketed
-            WHERE rn_desc = 1
-        ),
-        aligned AS (
-            SELECT
-                bucket_date,
-                MAX(CASE WHEN symbol = $3 THEN adjusted_close END) AS etf_close,
-                MAX(CASE WHEN symbol = $4 THEN adjusted_close END) AS benchmark_close
-            FROM aggregated
-            GROUP BY bucket_date
-            HAVING COUNT(*) FILTER (WHERE symbol = $3) > 0
-               AND COUNT(*) FILTER (WHERE symbol = $4) > 0
-        )
-        SELECT
-            bucket_date,
-            etf_close,
-            benchmark_close
-        FROM aligned
-        ORDER BY bucket_date;
-    """
+    if accept and _NDJSON_MEDIA_TYPE in accept:
+        return await _stream_performance_series(query, symbol, benchmark_symbol, interval_key, years)
 
+    return await cache.cached(
+        f"etf:performance:{symbol}:{benchmark_symbol}:{interval_key}:{years}",
+        _PERFORMANCE_CACHE_TTL,
+        lambda: _load_performance_series(query, symbol, benchmark_symbol, interval_key, years),
+    )
+
+
+async def _load_performance_series(
+    query: str,
+    symbol: str,
+    benchmark_symbol: str,
+    interval_key: str,
+    years: int,
+) -> PerformanceSeries:
     symbols = [symbol, benchmark_symbol]
-    rows = await conn.fetch(query, symbols, years, symbol, benchmark_symbol)
+    async with db.acquire() as conn:
+        rows = await conn.fetch(query, symbols, years, symbol, benchmark_symbol)
 
     if not rows:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到可用的价格数据")
 
-    base_etf = float(rows[0]["etf_close"])
-    base_benchmark = float(rows[0]["benchmark_close"])
-    if base_etf <= 0 or base_benchmark <= 0:
+    count = len(rows)
+    etf_close = np.fromiter((record["etf_close"] for record in rows), dtype=np.float64, count=count)
+    benchmark_close = np.fromiter((record["benchmark_close"] for record in rows), dtype=np.float64, count=count)
+    if etf_close[0] <= 0 or benchmark_close[0] <= 0:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="初始价格必须大于 0")
 
-    points: list[PerformancePoint] = []
-    for record in rows:
-        etf_close = float(record["etf_close"])
-        benchmark_close = float(record["benchmark_close"])
-        if etf_close <= 0 or benchmark_close <= 0:
-            continue
-
-        etf_value = etf_close / base_etf
-        benchmark_value = benchmark_close / base_benchmark
-        etf_return = etf_value - 1.0
-        benchmark_return = benchmark_value - 1.0
-
-        points.append(
-            PerformancePoint(
-                date=record["bucket_date"],
-                etf_value=etf_value,
-                benchmark_value=benchmark_value,
-                etf_cumulative_return_pct=etf_return,
-                benchmark_cumulative_return_pct=benchmark_return,
-                spread_pct=etf_return - benchmark_return,
-            )
+    valid = (etf_close > 0) & (benchmark_close > 0)
+    etf_value = etf_close[valid] / etf_close[0]
+    benchmark_value = benchmark_close[valid] / benchmark_close[0]
+    etf_return = etf_value - 1.0
+    benchmark_return = benchmark_value - 1.0
+    spread = etf_return - benchmark_return
+    dates = [record["bucket_date"] for record, keep in zip(rows, valid.tolist()) if keep]
+
+    points = [
+        PerformancePoint.model_construct(
+            date=point_date,
+            etf_value=ev,
+            benchmark_value=bv,
+            etf_cumulative_return_pct=er,
+            benchmark_cumulative_return_pct=br,
+            spread_pct=sp,
         )
+        for point_date, ev, bv, er, br, sp in zip(
+            dates,
+            etf_value.tolist(),
+            benchmark_value.tolist(),
+            etf_return.tolist(),
+            benchmark_return.tolist(),
+            spread.tolist(),
+        )
+    ]
 
     if not points:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="无法计算累计收益")
@@ -239,7 +355,7 @@ async def get_performance_series(
     start_date = points[0].date
     end_date = points[-1].date
 
-    return PerformanceSeries(
+    return PerformanceSeries.model_construct(
         symbol=symbol,
         benchmark=benchmark_symbol,
         interval=interval_key,
@@ -249,6 +365,69 @@ async def get_performance_series(
     )
 
 
+async def _stream_performance_series(
+    query: str,
+    symbol: str,
+    benchmark_symbol: str,
+    interval_key: str,
+    years: int,
+) -> StreamingResponse:
+    """通过服务端游标逐批读取，边计算边输出，不在内存中保留整条序列。"""
+    args = ([symbol, benchmark_symbol], years, symbol, benchmark_symbol)
+
+    async def fetch_records() -> AsyncIterator[asyncpg.Record]:
+        async with db.acquire() as conn, conn.transaction(readonly=True):
+            async for record in conn.cursor(query, *args, prefetch=_STREAM_PREFETCH):
+                yield record
+
+    # 响应开始输出后无法再修改状态码，先从同一游标取出首行完成校验，查询只执行一次；
+    # 校验失败立即关闭游标归还连接，否则由 body() 接着读取并在结束时关闭；
+    # body() 尚未开始迭代客户端就断开时，已启动的 records 由 asyncio 的异步生成器回收钩子关闭。
+    records = fetch_records()
+    first = await anext(records, None)
+    if first is None:
+        await records.aclose()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到可用的价格数据")
+    base_etf = first["etf_close"]
+    base_benchmark = first["benchmark_close"]
+    if base_etf <= 0 or base_benchmark <= 0:
+        await records.aclose()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="初始价格必须大于 0")
+
+    def encode(record: asyncpg.Record) -> Optional[bytes]:
+        etf_close = record["etf_close"]
+        benchmark_close = record["benchmark_close"]
+        if etf_close <= 0 or benchmark_close <= 0:
+            return None
+        etf_value = etf_close / base_etf
+        benchmark_value = benchmark_close / base_benchmark
+        etf_return = etf_value - 1.0
+        benchmark_return = benchmark_value - 1.0
+        point = PerformancePoint.model_construct(
+            date=record["bucket_date"],
+            etf_value=etf_value,
+            benchmark_value=benchmark_value,
+            etf_cumulative_return_pct=etf_return,
+            benchmark_cumulative_return_pct=benchmark_return,
+            spread_pct=etf_return - benchmark_return,
+        )
+        return point.model_dump_json(by_alias=True).encode("utf-8") + b"\n"
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            header = {"symbol": symbol, "benchmark": benchmark_symbol, "interval": interval_key}
+            yield json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n"
+            yield encode(first)
+            async for record in records:
+                line = encode(record)
+                if line is not None:
+                    yield line
+        finally:
+            await records.aclose()
+
+    return StreamingResponse(body(), media_type=_NDJSON_MEDIA_TYPE)
+
+
 @router.get("/{symbol}/stats", response_model=ReturnStats, summary="ETF 周期收益统计")
 async def get_return_stats(
     symbol: str,
@@ -258,100 +437,38 @@ async def get_return_stats(
         le=30,
         description="向后检索的年度周期数量",
     ),
-    conn: asyncpg.Connection = Depends(get_db_connection),
-) -> ReturnStats:
-    rows = await conn.fetch(
-        """
-        WITH bounds AS (
-            SELECT
-                MIN(mdq.trade_date) AS min_trade_date,
-                MAX(mdq.trade_date) AS max_trade_date
-            FROM mart_daily_quotes mdq
-            WHERE mdq.symbol = $1
-        ),
-        range_bounds AS (
-            SELECT
-                max_trade_date,
-                GREATEST(
-                    min_trade_date,
-                    (max_trade_date - make_interval(years => $2))::date
-                ) AS start_cut
-            FROM bounds
-        ),
-        actual_bounds AS (
-            SELECT
-                (SELECT MIN(trade_date)
-                 FROM mart_daily_quotes
-                 WHERE symbol = $1
-                   AND trade_date >= rb.start_cut) AS window_start,
-                rb.max_trade_date AS window_end
-            FROM range_bounds rb
-        ),
-        price_bounds AS (
-            SELECT
-                ab.window_start,
-                ab.window_end,
-                (SELECT adjusted_close
-                 FROM mart_daily_quotes
-                 WHERE symbol = $1
-                   AND trade_date = ab.window_start) AS start_price,
-                (SELECT adjusted_close
-                 FROM mart_daily_quotes
-                 WHERE symbol = $1
-                   AND trade_date = ab.window_end) AS end_price
-            FROM actual_bounds ab
-        )
-        SELECT
-            r.period_key,
-            r.period_start,
-            r.period_end,
-            r.total_return_pct,
-            r.compound_return_pct,
-            r.volatility_pct,
-            r.max_drawdown_pct,
-            ab.window_start,
-            ab.window_end,
-            pb.start_price,
-            pb.end_price
-        FROM mart_etf_periodic_returns r
-        CROSS JOIN actual_bounds ab
-        CROSS JOIN price_bounds pb
-        WHERE r.symbol = $1
-          AND r.period_type = 'year'
-          AND ab.window_start IS NOT NULL
-          AND r.period_end >= ab.window_start
-          AND r.period_start <= ab.window_end
-        ORDER BY r.period_start DESC
-        """,
-        symbol,
-        window_years,
+) -> Response:
+    return await cache.cached(
+        f"etf:stats:{symbol}:{window_years}",
+        _DAILY_MART_CACHE_TTL,
+        lambda: _load_return_stats(symbol, window_years),
     )
 
-    if not rows:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到年度收益数据")
 
-    window_start = rows[0]["window_start"] if rows and rows[0]["window_start"] is not None else None
-    window_end = rows[0]["window_end"] if rows and rows[0]["window_end"] is not None else None
-    start_price = rows[0]["start_price"] if rows else None
-    end_price = rows[0]["end_price"] if rows else None
+async def _load_return_stats(
+    symbol: str,
+    window_years: int,
+) -> ReturnStats:
+    async with db.acquire() as conn:
+        row = await conn.fetchrow(_SQL_RETURN_STATS, symbol, window_years)
 
-    ordered_rows = _sort_records(rows)
-    total_periods = len(ordered_rows)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到年度收益数据")
 
-    product = 1.0
-    valid_returns = 0
-    for record in ordered_rows:
-        period_return = record["compound_return_pct"] or record["total_return_pct"]
-        if period_return is None:
-            continue
-        product *= 1.0 + float(period_return)
-        valid_returns += 1
+    window_start = row["window_start"]
+    window_end = row["window_end"]
+    start_price = row["start_price"]
+    end_price = row["end_price"]
+    valid_returns = row["valid_returns"]
+    compounded_growth = row["compounded_growth"]
+    # 按收益从高到低排好的周期：首个即最佳，末个即最差。
+    ranked_period_keys = row["ranked_period_keys"] or [None]
 
     total_return: Optional[float] = None
     if start_price and end_price and start_price > 0:
-        total_return = float(end_price / start_price) - 1.0
+        total_return = end_price / start_price - 1.0
     elif valid_returns:
-        total_return = product - 1.0
+        total_return = compounded_growth - 1.0
 
     average_annual: Optional[float] = None
     if total_return is not None and window_start and window_end and window_end > window_start:
@@ -360,41 +477,20 @@ async def get_return_stats(
             average_annual = (1.0 + total_return) ** (365.25 / span_days) - 1.0
 
     if average_annual is None and valid_returns:
-        average_annual = product ** (1.0 / valid_returns) - 1.0
-
-    max_drawdown: Optional[float] = None
-    for record in ordered_rows:
-        drawdown = _to_float(record["max_drawdown_pct"])
-        if drawdown is None:
-            continue
-        max_drawdown = drawdown if max_drawdown is None or drawdown < max_drawdown else max_drawdown
-
-    volatility_samples = [float(record["volatility_pct"]) for record in ordered_rows if record["volatility_pct"] is not None]
-    average_volatility = (sum(volatility_samples) / len(volatility_samples)) if volatility_samples else None
-
-    best_record = max(
-        (record for record in ordered_rows if record["total_return_pct"] is not None),
-        key=lambda item: item["total_return_pct"],
-        default=None,
-    )
-    worst_record = min(
-        (record for record in ordered_rows if record["total_return_pct"] is not None),
-        key=lambda item: item["total_return_pct"],
-        default=None,
-    )
+        average_annual = compounded_growth ** (1.0 / valid_returns) - 1.0
 
-    return ReturnStats(
+    return ReturnStats.model_construct(
         symbol=symbol,
         window_years=window_years,
-        periods=total_periods,
+        periods=row["periods"],
         total_return_pct=total_return,
         average_annual_return_pct=average_annual,
-        max_drawdown_pct=max_drawdown,
-        average_volatility_pct=average_volatility,
-        best_period_key=best_record["period_key"] if best_record else None,
-        best_period_return_pct=_to_float(best_record["total_return_pct"]) if best_record else None,
-        worst_period_key=worst_record["period_key"] if worst_record else None,
-        worst_period_return_pct=_to_float(worst_record["total_return_pct"]) if worst_record else None,
-        start_date=window_start or ordered_rows[0]["period_start"],
-        end_date=window_end or ordered_rows[-1]["period_end"],
+        max_drawdown_pct=row["max_drawdown"],
+        average_volatility_pct=row["average_volatility"],
+        best_period_key=ranked_period_keys[0],
+        best_period_return_pct=row["best_period_return"],
+        worst_period_key=ranked_period_keys[-1],
+        worst_period_return_pct=row["worst_period_return"],
+        start_date=window_start or row["first_period_start"],
+        end_date=window_end or row["last_period_end"],
     )
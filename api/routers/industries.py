@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+import json
+from typing import List, Optional
 
-import asyncpg
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from ..deps import get_db_connection, verify_api_token
+from ..db import db
+from ..deps import verify_api_token
 from ..schemas import IndustryGroup, IndustrySecurity
 
 
@@ -25,21 +26,22 @@ def _normalize_query_value(value: Optional[str]) -> Optional[str]:
     return stripped or _FALLBACK_LABEL
 
 
-def _classify_asset_type(asset_type: Optional[str]) -> str:
-    if not asset_type:
-        return "other"
-
-    normalized = asset_type.strip().lower()
-    if not normalized:
-        return "other"
-
-    if "etf" in normalized or "exchange traded fund" in normalized:
-        return "etf"
-
-    if "stock" in normalized or normalized in {"equity", "adr", "common stock"}:
-        return "stock"
-
-    return "other"
+# sector/industry 为 NULL 时不过滤；SQL 文本固定，asyncpg 按连接缓存预编译语句。
+# 分组由 ETL 写入 mart_industry_groups（见 config/sql/mart_industry_groups.sql），按主键顺序读取即可；
+# securities 的键与 IndustrySecurity 字段名一致，可直接 model_construct。
+_SQL_INDUSTRY_GROUPS = """
+    SELECT
+        sector AS sector_name,
+        industry AS industry_name,
+        CASE WHEN $3 THEN etf_count ELSE 0 END AS etf_count,
+        stock_count,
+        other_count,
+        CASE WHEN $3 THEN securities ELSE non_etf_securities END AS securities
+    FROM mart_industry_groups
+    WHERE ($1::text IS NULL OR sector = $1)
+      AND ($2::text IS NULL OR industry = $2)
+    ORDER BY sector, industry
+"""
 
 
 @router.get(
@@ -61,98 +63,40 @@ async def list_industries(
         default=True,
         description="是否自动排除 sector/industry 为空的记录",
     ),
-    conn: asyncpg.Connection = Depends(get_db_connection),
 ) -> List[IndustryGroup]:
-    conditions = ["is_active IS DISTINCT FROM FALSE"]
-    values: List[str] = []
-    param_index = 1
-
     sector_value = _normalize_query_value(sector)
     industry_value = _normalize_query_value(industry)
 
-    if sector_value is not None:
-        conditions.append(f"COALESCE(NULLIF(sector, ''), '{_FALLBACK_LABEL}') = ${param_index}")
-        values.append(sector_value)
-        param_index += 1
-
-    if industry_value is not None:
-        conditions.append(f"COALESCE(NULLIF(industry, ''), '{_FALLBACK_LABEL}') = ${param_index}")
-        values.append(industry_value)
-        param_index += 1
-
-    where_clause = " AND ".join(conditions)
-
-    rows = await conn.fetch(
-        f"""
-        SELECT
-            COALESCE(NULLIF(sector, ''), '{_FALLBACK_LABEL}') AS sector_name,
-            COALESCE(NULLIF(industry, ''), '{_FALLBACK_LABEL}') AS industry_name,
-            symbol,
-            name,
-            exchange,
-            asset_type
-        FROM dim_symbol
-        WHERE {where_clause}
-        ORDER BY sector_name, industry_name, symbol
-        """,
-        *values,
-    )
+    # 分组表只有几百行，直接 fetch；连接在构造响应前即归还。
+    async with db.acquire() as conn:
+        rows = await conn.fetch(_SQL_INDUSTRY_GROUPS, sector_value, industry_value, include_etfs)
 
     if not rows:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到行业数据")
 
-    group_map: Dict[Tuple[str, str], Dict[str, Any]] = {}
-
+    result: List[IndustryGroup] = []
     for row in rows:
-        sector_label = row["sector_name"]
         industry_label = row["industry_name"]
-        key = (sector_label, industry_label)
-        bucket = _classify_asset_type(row["asset_type"])
-
-        if not include_etfs and bucket == "etf":
-            continue
-
-        group = group_map.setdefault(
-            key,
-            {
-                "sector": sector_label,
-                "industry": industry_label,
-                "securities": [],
-                "counts": {"total": 0, "etf": 0, "stock": 0, "other": 0},
-            },
-        )
-
-        security = IndustrySecurity(
-            symbol=row["symbol"],
-            name=row["name"],
-            exchange=row["exchange"],
-            asset_type=row["asset_type"],
-        )
-        group["securities"].append(security)
-
-        counts = group["counts"]
-        counts["total"] += 1
-        counts[bucket] += 1
-
-    result: List[IndustryGroup] = []
-    for (sector_label, industry_label) in sorted(group_map.keys(), key=lambda item: (item[0], item[1])):
-        group = group_map[(sector_label, industry_label)]
-        counts = group["counts"]
-
         if skip_uncategorized and industry_value is None and industry_label == _FALLBACK_LABEL:
             continue
 
-        if counts["stock"] < min_stock_count:
+        # 排除 ETF 后没有剩余标的的分组不输出。
+        securities = row["securities"]
+        if securities is None or row["stock_count"] < min_stock_count:
             continue
+
+        etf_count = row["etf_count"]
+        stock_count = row["stock_count"]
+        other_count = row["other_count"]
         result.append(
-            IndustryGroup(
-                sector=sector_label,
+            IndustryGroup.model_construct(
+                sector=row["sector_name"],
                 industry=industry_label,
-                total_symbols=counts["total"],
-                etf_count=counts["etf"],
-                stock_count=counts["stock"],
-                other_count=counts["other"],
-                securities=group["securities"],
+                total_symbols=etf_count + stock_count + other_count,
+                etf_count=etf_count,
+                stock_count=stock_count,
+                other_count=other_count,
+                securities=[IndustrySecurity.model_construct(**item) for item in json.loads(securities)],
             )
         )
 
@@ -0,0 +1,26 @@
+-- Normalized sector/industry labels and asset buckets for /api/industries, computed at write time.
+-- Adding STORED generated columns rewrites dim_symbol once; run during a quiet window.
+
+ALTER TABLE dim_symbol
+    ADD COLUMN IF NOT EXISTS sector_norm TEXT
+        GENERATED ALWAYS AS (COALESCE(NULLIF(sector, ''), '未分类')) STORED,
+    ADD COLUMN IF NOT EXISTS industry_norm TEXT
+        GENERATED ALWAYS AS (COALESCE(NULLIF(industry, ''), '未分类')) STORED,
+    ADD COLUMN IF NOT EXISTS asset_bucket TEXT
+        GENERATED ALWAYS AS (
+            CASE
+                WHEN NULLIF(BTRIM(LOWER(asset_type)), '') IS NULL THEN 'other'
+                WHEN BTRIM(LOWER(asset_type)) LIKE '%etf%'
+                  OR BTRIM(LOWER(asset_type)) LIKE '%exchange traded fund%' THEN 'etf'
+                WHEN BTRIM(LOWER(asset_type)) LIKE '%stock%'
+                  OR BTRIM(LOWER(asset_type)) IN ('equity', 'adr') THEN 'stock'
+                ELSE 'other'
+            END
+        ) STORED;
+
+-- Predicate matches the active-symbol filter in the industries query.
+CREATE INDEX IF NOT EXISTS idx_dim_symbol_sector_industry_bucket
+    ON dim_symbol (sector_norm, industry_norm, asset_bucket)
+    WHERE is_active IS DISTINCT FROM FALSE;
+
+ANALYZE dim_symbol;
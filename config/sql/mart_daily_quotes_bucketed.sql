@@ -0,0 +1,66 @@
+-- Narrow copy of mart_daily_quotes with pre-computed month/year buckets.
+-- Serves /api/etfs/{symbol}/performance without re-deriving buckets on every request.
+
+CREATE TABLE IF NOT EXISTS mart_daily_quotes_bucketed (
+    symbol              VARCHAR(20)    NOT NULL,
+    trade_date          DATE           NOT NULL,
+    bucket_date_month   DATE           NOT NULL,
+    bucket_date_year    DATE           NOT NULL,
+    adjusted_close      NUMERIC(16,6)  NOT NULL CHECK (adjusted_close > 0),
+    updated_at          TIMESTAMPTZ    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- INCLUDE lets the /performance scan run index-only on the primary key.
+    PRIMARY KEY (symbol, trade_date) INCLUDE (bucket_date_month, bucket_date_year, adjusted_close)
+);
+
+
+CREATE OR REPLACE FUNCTION refresh_mart_daily_quotes_bucketed(
+    p_symbols TEXT[] DEFAULT NULL,
+    p_start   DATE   DEFAULT NULL,
+    p_end     DATE   DEFAULT NULL
+) RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_symbols TEXT[];
+    v_start   DATE := COALESCE(p_start, DATE '1900-01-01');
+    v_end     DATE := COALESCE(p_end, CURRENT_DATE);
+BEGIN
+    IF v_end < v_start THEN
+        RAISE EXCEPTION 'refresh_mart_daily_quotes_bucketed: end date % precedes start date %', v_end, v_start;
+    END IF;
+
+    IF p_symbols IS NULL OR array_length(p_symbols, 1) IS NULL THEN
+        v_symbols := NULL;
+    ELSE
+        v_symbols := p_symbols;
+    END IF;
+
+    DELETE FROM mart_daily_quotes_bucketed
+    WHERE trade_date BETWEEN v_start AND v_end
+      AND (v_symbols IS NULL OR symbol = ANY (v_symbols));
+
+    INSERT INTO mart_daily_quotes_bucketed (
+        symbol,
+        trade_date,
+        bucket_date_month,
+        bucket_date_year,
+        adjusted_close,
+        updated_at
+    )
+    SELECT
+        mdq.symbol,
+        mdq.trade_date,
+        DATE_TRUNC('month', mdq.trade_date)::DATE,
+        DATE_TRUNC('year', mdq.trade_date)::DATE,
+        mdq.adjusted_close,
+        CURRENT_TIMESTAMP
+    FROM mart_daily_quotes mdq
+    WHERE mdq.trade_date BETWEEN v_start AND v_end
+      AND (v_symbols IS NULL OR mdq.symbol = ANY (v_symbols))
+      AND mdq.adjusted_close IS NOT NULL
+      AND mdq.adjusted_close > 0;
+END;
+$$;
+
+COMMENT ON FUNCTION refresh_mart_daily_quotes_bucketed(TEXT[], DATE, DATE)
+    IS 'Rebuild bucketed adjusted closes from mart_daily_quotes for the given symbols and date range.';
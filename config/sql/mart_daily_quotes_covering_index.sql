@@ -0,0 +1,9 @@
+-- Covering index for scripts.etf_rankings: the per-window first trading day / trading-day count and the
+-- start/end price lookups filter on adjusted_close, so including it lets them run as index-only scans.
+-- Run outside a transaction block (psql -f ...): CREATE INDEX CONCURRENTLY cannot run inside one.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mart_daily_quotes_symbol_date_adj_close
+    ON mart_daily_quotes (symbol, trade_date)
+    INCLUDE (adjusted_close);
+
+ANALYZE mart_daily_quotes;
@@ -23,8 +23,10 @@ CREATE UNIQUE INDEX IF NOT EXISTS idx_mart_etf_periodic_returns_pk
 CREATE INDEX IF NOT EXISTS idx_mart_etf_periodic_returns_period
     ON mart_etf_periodic_returns (period_type, period_key);
 
-CREATE INDEX IF NOT EXISTS idx_mart_etf_periodic_returns_symbol_period_start
-    ON mart_etf_periodic_returns (symbol, period_type, period_start);
+CREATE INDEX IF NOT EXISTS idx_mart_etf_periodic_returns_symbol_period_covering
+    ON mart_etf_periodic_returns (symbol, period_type, period_start DESC)
+    INCLUDE (period_key, period_end, trading_days, total_return_pct,
+             compound_return_pct, volatility_pct, max_drawdown_pct);
 
 
 CREATE OR REPLACE FUNCTION refresh_mart_etf_periodic_returns(
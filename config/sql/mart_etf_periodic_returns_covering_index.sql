@@ -0,0 +1,12 @@
+-- Covering index for /api/etfs/{symbol}/returns so the endpoint is served by an index-only scan.
+-- Run outside a transaction block (psql -f ...): CREATE/DROP INDEX CONCURRENTLY cannot run inside one.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mart_etf_periodic_returns_symbol_period_covering
+    ON mart_etf_periodic_returns (symbol, period_type, period_start DESC)
+    INCLUDE (period_key, period_end, trading_days, total_return_pct,
+             compound_return_pct, volatility_pct, max_drawdown_pct);
+
+-- Superseded by the covering index above (same key prefix).
+DROP INDEX CONCURRENTLY IF EXISTS idx_mart_etf_periodic_returns_symbol_period_start;
+
+ANALYZE mart_etf_periodic_returns;
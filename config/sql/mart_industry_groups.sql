@@ -0,0 +1,66 @@
+-- Pre-aggregated sector/industry groups for /api/industries.
+-- dim_symbol changes at most once per ETL run, so groups are rebuilt after writes instead of per request.
+-- Depends on the generated columns from dim_symbol_normalized_columns.sql.
+
+CREATE TABLE IF NOT EXISTS mart_industry_groups (
+    sector              TEXT COLLATE "C"  NOT NULL,
+    industry            TEXT COLLATE "C"  NOT NULL,
+    etf_count           INTEGER           NOT NULL,
+    stock_count         INTEGER           NOT NULL,
+    other_count         INTEGER           NOT NULL,
+    securities          JSONB             NOT NULL,
+    non_etf_securities  JSONB,
+    updated_at          TIMESTAMPTZ       NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (sector, industry)
+);
+
+
+CREATE OR REPLACE FUNCTION refresh_mart_industry_groups() RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    DELETE FROM mart_industry_groups;
+
+    INSERT INTO mart_industry_groups (
+        sector,
+        industry,
+        etf_count,
+        stock_count,
+        other_count,
+        securities,
+        non_etf_securities,
+        updated_at
+    )
+    SELECT
+        sector_norm,
+        industry_norm,
+        COUNT(*) FILTER (WHERE asset_bucket = 'etf'),
+        COUNT(*) FILTER (WHERE asset_bucket = 'stock'),
+        COUNT(*) FILTER (WHERE asset_bucket = 'other'),
+        jsonb_agg(
+            jsonb_build_object(
+                'symbol', symbol,
+                'name', name,
+                'exchange', exchange,
+                'asset_type', asset_type
+            )
+            ORDER BY symbol
+        ),
+        jsonb_agg(
+            jsonb_build_object(
+                'symbol', symbol,
+                'name', name,
+                'exchange', exchange,
+                'asset_type', asset_type
+            )
+            ORDER BY symbol
+        ) FILTER (WHERE asset_bucket <> 'etf'),
+        CURRENT_TIMESTAMP
+    FROM dim_symbol
+    WHERE is_active IS DISTINCT FROM FALSE
+    GROUP BY sector_norm, industry_norm;
+END;
+$$;
+
+COMMENT ON FUNCTION refresh_mart_industry_groups()
+    IS 'Rebuild mart_industry_groups from active dim_symbol rows.';
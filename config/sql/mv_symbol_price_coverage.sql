@@ -0,0 +1,19 @@
+-- Per-symbol price coverage for scripts.etf_rankings.
+-- Replaces the full-history GROUP BY over mart_daily_quotes with a lookup of one row per symbol;
+-- refreshed by the ETL (see refresh_symbol_price_coverage in scripts/etl_loaders.py) after each write.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_symbol_price_coverage AS
+SELECT
+    symbol,
+    min(trade_date) AS first_trade_date,
+    max(trade_date) AS last_trade_date,
+    count(*) FILTER (WHERE adjusted_close IS NOT NULL) AS total_days
+FROM mart_daily_quotes
+GROUP BY symbol
+WITH DATA;
+
+-- REFRESH ... CONCURRENTLY requires a unique index.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_symbol_price_coverage_symbol
+    ON mv_symbol_price_coverage (symbol);
+
+ANALYZE mv_symbol_price_coverage;
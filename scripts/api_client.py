@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import logging
-import time
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import requests
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+from requests.adapters import HTTPAdapter
+from tenacity import RetryCallState, retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
 from .config import get_config
 
@@ -13,16 +19,58 @@ from .config import get_config
 LOGGER = logging.getLogger(__name__)
 
 
+class RateLimited(Exception):
+    """EODHD 返回 429；retry_after 为服务端要求的等待秒数。"""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"rate limited, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    # 仅对网络异常、限流与 5xx 重试；404 等客户端错误重试也不会成功，直接抛出。
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, RateLimited)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500
+    return False
+
+
+_backoff = wait_exponential_jitter(multiplier=0.5, max=8, exp_base=2, jitter=1)
+
+
+def _retry_wait(retry_state: RetryCallState) -> float:
+    # 429 按 Retry-After 等待，不再叠加指数退避。
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    if isinstance(exc, RateLimited):
+        return exc.retry_after
+    return _backoff(retry_state)
+
+
+def _parse_retry_after(value: Optional[str]) -> float:
+    try:
+        return max(float(value), 0.0) if value else 1.0
+    except ValueError:
+        return 1.0
+
+
 class EODHDClient:
     BASE_URL = "https://eodhd.com/api"
+    POOL_MAXSIZE = 32
 
     def __init__(self, token: Optional[str] = None, session: Optional[requests.Session] = None) -> None:
         cfg = get_config()
         self.token = token or cfg.eodhd_token
         self.timeout = cfg.request_timeout
-        self.session = session or requests.Session()
+        if session is None:
+            session = requests.Session()
+            # 多标的并行、单标的多接口并发时复用更多 keep-alive 连接（默认仅 10 个）；
+            # 传输层不重试，所有重试（含建连失败）统一由 get() 上的 tenacity 负责，避免两层重试次数相乘。
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_MAXSIZE, max_retries=0)
+            session.mount("https://", adapter)
+        self.session = session
 
-    @retry(stop=stop_after_attempt(5), wait=wait_random_exponential(multiplier=1, max=8))
+    @retry(retry=retry_if_exception(_is_retryable), stop=stop_after_attempt(5), wait=_retry_wait)
     def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         url = f"{self.BASE_URL}{path}"
         payload = dict(params or {})
@@ -31,9 +79,19 @@ class EODHDClient:
         LOGGER.debug("GET %s params=%s", url, payload)
         response = self.session.get(url, params=payload, timeout=self.timeout)
         if response.status_code == 429:
-            retry_after = float(response.headers.get("Retry-After", "1"))
-            LOGGER.warning("Rate limited by EODHD, sleeping for %s seconds", retry_after)
-            time.sleep(retry_after)
-            response = self.session.get(url, params=payload, timeout=self.timeout)
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            LOGGER.warning("Rate limited by EODHD, retrying in %s seconds", retry_after)
+            raise RateLimited(retry_after)
         response.raise_for_status()
+        # 十年日线等响应体可达数 MB，有 orjson 时直接解析原始字节，比 response.json() 快数倍。
+        if orjson is not None:
+            return orjson.loads(response.content)
         return response.json()
+
+    def get_many(self, calls: Sequence[Tuple[str, Optional[Dict[str, Any]]]]) -> List[Any]:
+        """并发发起互不依赖的 GET 请求，结果顺序与 calls 一致。"""
+        if not calls:
+            return []
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            futures = [executor.submit(self.get, path, params) for path, params in calls]
+            return [future.result() for future in futures]
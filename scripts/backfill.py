@@ -1,21 +1,26 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
 import sys
 import time
 from datetime import datetime, timezone
-from typing import List, Sequence
+from pathlib import Path
+from typing import List, Optional, Sequence
 
 from requests import HTTPError
 
 from .api_client import EODHDClient
 from .config import get_config
-from .db import get_connection
+from .db import get_connection, get_cursor
 from .etl_loaders import (
     log_null_metrics,
+    refresh_daily_quotes_bucketed,
     refresh_etf_periodic_returns,
+    refresh_industry_groups,
     refresh_mart_daily_quotes,
+    refresh_symbol_price_coverage,
     upsert_dividends,
     upsert_eod_quotes,
     upsert_fundamentals,
@@ -45,6 +50,11 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument("--sleep", type=float, default=0.2, help="Sleep seconds between symbol processing.")
     parser.add_argument("--limit", type=int, help="Limit number of symbols processed.")
+    parser.add_argument(
+        "--refresh-symbols",
+        action="store_true",
+        help="Ignore the cached exchange symbol list and fetch it again.",
+    )
     return parser.parse_args()
 
 
@@ -67,7 +77,41 @@ def normalize_symbol(code: str, exchange: str) -> str:
     return f"{code}.{suffix}"
 
 
-def fetch_exchange_symbols(client: EODHDClient, exchange: str) -> List[str]:
+SYMBOL_CACHE_DIR = Path("state")
+SYMBOL_CACHE_TTL = 24 * 3600
+
+
+def _symbol_cache_path(exchange: str) -> Path:
+    return SYMBOL_CACHE_DIR / f"symbols_{exchange.upper().replace(' ', '_')}.json"
+
+
+def _load_cached_symbols(path: Path) -> Optional[List[str]]:
+    try:
+        if time.time() - path.stat().st_mtime >= SYMBOL_CACHE_TTL:
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cached_symbols(path: Path, symbols: List[str]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(symbols), encoding="utf-8")
+        tmp_path.replace(path)
+    except OSError as exc:
+        LOGGER.warning("Failed to cache symbol list at %s: %s", path, exc)
+
+
+def fetch_exchange_symbols(client: EODHDClient, exchange: str, refresh: bool = False) -> List[str]:
+    cache_path = _symbol_cache_path(exchange)
+    if not refresh:
+        cached = _load_cached_symbols(cache_path)
+        if cached is not None:
+            LOGGER.info("Using cached symbol list for exchange %s (%d symbols)", exchange, len(cached))
+            return cached
+
     LOGGER.info("Fetching stock + ETF symbols for exchange %s", exchange)
     symbols: List[str] = []
     seen = set()
@@ -81,6 +125,8 @@ def fetch_exchange_symbols(client: EODHDClient, exchange: str) -> List[str]:
             if normalized not in seen:
                 symbols.append(normalized)
                 seen.add(normalized)
+    if symbols:
+        _save_cached_symbols(cache_path, symbols)
     return symbols
 
 
@@ -88,14 +134,17 @@ def process_symbol(
     client: EODHDClient, symbol: str, start_date: str, end_date: str
 ) -> None:
     LOGGER.info("Processing %s", symbol)
-    fundamentals = client.get(f"/fundamentals/{symbol}", {})
+    fundamentals, eod_rows, dividends, splits = client.get_many(
+        [
+            (f"/fundamentals/{symbol}", {}),
+            (f"/eod/{symbol}", {"from": start_date, "to": end_date}),
+            (f"/div/{symbol}", {"from": start_date, "to": end_date}),
+            (f"/splits/{symbol}", {"from": "1900-01-01", "to": end_date}),
+        ]
+    )
     general = fundamentals.get("General", {})
     stored_symbol = general.get("PrimaryTicker") or general.get("Code") or symbol
 
-    eod_rows = client.get(f"/eod/{symbol}", {"from": start_date, "to": end_date})
-    dividends = client.get(f"/div/{symbol}", {"from": start_date, "to": end_date})
-    splits = client.get(f"/splits/{symbol}", {"from": "1900-01-01", "to": end_date})
-
     with get_connection() as conn:
         cur = conn.cursor()
         try:
@@ -106,6 +155,7 @@ def process_symbol(
             upsert_splits(cur, stored_symbol, splits)
             refresh_mart_daily_quotes(cur, [stored_symbol], start_date, end_date)
             refresh_etf_periodic_returns(cur, [stored_symbol], start_date, end_date)
+            refresh_daily_quotes_bucketed(cur, [stored_symbol], start_date, end_date)
             metrics = log_null_metrics(cur, [stored_symbol])
             conn.commit()
             LOGGER.info("Completed %s metrics=%s", stored_symbol, metrics)
@@ -125,7 +175,7 @@ def main() -> None:
     if args.symbols:
         symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
     elif args.exchange:
-        symbols = fetch_exchange_symbols(client, args.exchange)
+        symbols = fetch_exchange_symbols(client, args.exchange, refresh=args.refresh_symbols)
     else:
         raise SystemExit("Either --symbols or --exchange must be provided.")
 
@@ -143,6 +193,10 @@ def main() -> None:
         if idx % 50 == 0:
             LOGGER.info("Processed %d symbols", idx)
 
+    with get_cursor(commit=True) as cur:
+        refresh_industry_groups(cur)
+        refresh_symbol_price_coverage(cur)
+
 
 if __name__ == "__main__":
     main()
@@ -4,8 +4,9 @@ import argparse
 import logging
 import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List, Sequence, Set
+from typing import Dict, List, Sequence, Set, Tuple
 
 from requests import HTTPError
 
@@ -14,14 +15,18 @@ from .config import get_config
 from .db import get_connection
 from .etl_loaders import (
     log_null_metrics,
+    refresh_daily_quotes_bucketed,
     refresh_etf_periodic_returns,
+    refresh_industry_groups,
     refresh_mart_daily_quotes,
+    refresh_symbol_price_coverage,
     upsert_dividends,
-    upsert_eod_quotes,
-    upsert_fundamentals,
+    upsert_eod_quotes_bulk,
+    upsert_fundamentals_bulk,
     upsert_splits,
-    upsert_symbol,
+    upsert_symbols_bulk,
 )
+from .utils import canonical_symbol
 
 
 logging.basicConfig(
@@ -78,13 +83,23 @@ def fetch_bulk_quotes(client: EODHDClient, trading_date: str) -> Dict[str, List[
     return result
 
 
+FUNDAMENTALS_WORKERS = 16
+
+
 def ensure_fundamentals(client: EODHDClient, symbols: Sequence[str]) -> Dict[str, dict]:
-    fundamentals_map = {}
+    fundamentals_map: Dict[str, dict] = {}
     total = len(symbols)
-    for idx, symbol in enumerate(symbols, start=1):
-        LOGGER.info("Fetching fundamentals %s (%d/%d)", symbol, idx, total)
-        fundamentals = client.get(f"/fundamentals/{symbol}", {})
-        fundamentals_map[symbol] = fundamentals
+    with ThreadPoolExecutor(max_workers=FUNDAMENTALS_WORKERS) as executor:
+        futures = {executor.submit(client.get, f"/fundamentals/{symbol}", {}): symbol for symbol in symbols}
+        for idx, future in enumerate(as_completed(futures), start=1):
+            symbol = futures[future]
+            try:
+                fundamentals_map[symbol] = future.result()
+            except Exception as exc:
+                # 单个标的失败不影响其余请求；未取到的标的在后续处理时按需重新获取。
+                LOGGER.warning("Fetching fundamentals %s failed (%d/%d): %s", symbol, idx, total, exc)
+                continue
+            LOGGER.info("Fetched fundamentals %s (%d/%d)", symbol, idx, total)
     return fundamentals_map
 
 
@@ -156,6 +171,10 @@ def process_daily_update(args: argparse.Namespace) -> None:
             existing = {row[0] for row in cur.fetchall()}
 
             processed_symbols: List[str] = []
+            # 标的维度、基本面与行情先按入库代码归集，循环结束后各自一次性写入，避免逐标的往返数据库。
+            symbol_batch: Dict[str, dict] = {}
+            eod_batch: Dict[str, List[dict]] = defaultdict(list)
+            corporate_actions: List[Tuple[str, list, list]] = []
 
             for idx, symbol in enumerate(symbols, start=1):
                 LOGGER.info("Processing %s (%d/%d)", symbol, idx, total_symbols)
@@ -165,8 +184,8 @@ def process_daily_update(args: argparse.Namespace) -> None:
                 if fundamentals:
                     general = fundamentals.get("General", {})
                     stored_symbol = general.get("PrimaryTicker") or general.get("Code") or symbol
-                    stored_symbol = upsert_symbol(cur, stored_symbol, fundamentals)
-                    upsert_fundamentals(cur, stored_symbol, fundamentals)
+                    stored_symbol = canonical_symbol(stored_symbol, general)
+                    symbol_batch[stored_symbol] = fundamentals
                     db_symbol = stored_symbol
                 else:
                     db_symbol = symbol
@@ -175,23 +194,32 @@ def process_daily_update(args: argparse.Namespace) -> None:
                         fundamentals_map[symbol] = fundamentals
                         general = fundamentals.get("General", {})
                         stored_symbol = general.get("PrimaryTicker") or general.get("Code") or symbol
-                        stored_symbol = upsert_symbol(cur, stored_symbol, fundamentals)
-                        upsert_fundamentals(cur, stored_symbol, fundamentals)
+                        stored_symbol = canonical_symbol(stored_symbol, general)
+                        symbol_batch[stored_symbol] = fundamentals
                         db_symbol = stored_symbol
                         existing.add(db_symbol)
 
-                upsert_eod_quotes(cur, db_symbol, rows)
+                eod_batch[db_symbol].extend(rows)
                 if db_symbol not in processed_symbols:
                     processed_symbols.append(db_symbol)
 
                 if not args.skip_dividends:
                     dividends = client.get(f"/div/{api_symbol}", {"from": end_date, "to": end_date})
                     splits = client.get(f"/splits/{api_symbol}", {"from": end_date, "to": end_date})
-                    upsert_dividends(cur, db_symbol, dividends)
-                    upsert_splits(cur, db_symbol, splits)
-
+                    corporate_actions.append((db_symbol, dividends, splits))
+
+            # dim_symbol 先于引用它的事实表写入。
+            upsert_symbols_bulk(cur, symbol_batch)
+            upsert_fundamentals_bulk(cur, symbol_batch)
+            for db_symbol, dividends, splits in corporate_actions:
+                upsert_dividends(cur, db_symbol, dividends)
+                upsert_splits(cur, db_symbol, splits)
+            upsert_eod_quotes_bulk(cur, eod_batch)
             refresh_mart_daily_quotes(cur, processed_symbols, start_date.isoformat(), end_date)
             refresh_etf_periodic_returns(cur, processed_symbols, start_date, end_date)
+            refresh_daily_quotes_bucketed(cur, processed_symbols, start_date, end_date)
+            refresh_industry_groups(cur)
+            refresh_symbol_price_coverage(cur)
             metrics = log_null_metrics(cur, processed_symbols)
             conn.commit()
             LOGGER.info("Daily update completed metrics=%s", metrics)
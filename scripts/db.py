@@ -1,33 +1,67 @@
 from __future__ import annotations
 
+import atexit
+import threading
 from contextlib import contextmanager
-from typing import Generator
+from typing import Generator, Optional
 
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 
 from .config import get_config
 
 
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def init_pool(size: int = 1) -> ThreadedConnectionPool:
+    """创建进程级连接池；已存在时直接返回。size 需不小于同时借出的连接数。"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            cfg = get_config()
+            # minconn 与 maxconn 相同：归还时超出 minconn 的连接会被关闭，无法复用。
+            _pool = ThreadedConnectionPool(
+                size,
+                size,
+                dbname=cfg.pg_database,
+                user=cfg.pg_user,
+                password=cfg.pg_password,
+                host=cfg.pg_host,
+                port=cfg.pg_port,
+            )
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+atexit.register(close_pool)
+
+
 @contextmanager
 def get_connection() -> Generator[psycopg2.extensions.connection, None, None]:
-    cfg = get_config()
-    conn = psycopg2.connect(
-        dbname=cfg.pg_database,
-        user=cfg.pg_user,
-        password=cfg.pg_password,
-        host=cfg.pg_host,
-        port=cfg.pg_port,
-    )
+    """从进程级连接池借出连接，同一进程内多次查询免去重复建连与认证。"""
+    pool = init_pool()
+    conn = pool.getconn()
     try:
         yield conn
     finally:
-        conn.close()
+        # 未结束的事务由 putconn 回滚；已断开的连接直接丢弃，下次借出时重建。
+        pool.putconn(conn, close=bool(conn.closed))
 
 
 @contextmanager
-def get_cursor(commit: bool = False) -> Generator[psycopg2.extensions.cursor, None, None]:
+def get_cursor(commit: bool = False, name: Optional[str] = None) -> Generator[psycopg2.extensions.cursor, None, None]:
+    """name 非空时使用服务端游标（DECLARE CURSOR），迭代时按 itersize 分批取数。"""
     with get_connection() as conn:
-        cur = conn.cursor()
+        cur = conn.cursor(name=name)
         try:
             yield cur
             if commit:
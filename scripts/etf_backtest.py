@@ -2,15 +2,18 @@ from __future__ import annotations
 
 import argparse
 import csv
+import io
 import logging
 import math
+import struct
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
-from datetime import date
-from decimal import Decimal
+from datetime import date, timedelta
 from pathlib import Path
-from statistics import pstdev
 from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
+
 from .db import get_cursor
 
 
@@ -63,10 +66,10 @@ PORTFOLIOS: Dict[str, PortfolioDefinition] = {
 
 @dataclass
 class PortfolioSeries:
-    nav_points: List[Tuple[date, Decimal]]
-    daily_returns: List[Optional[Decimal]]
-    drawdowns: List[Decimal]
-    max_drawdown: Decimal
+    nav_points: List[Tuple[date, float]]
+    daily_returns: List[Optional[float]]
+    drawdowns: List[float]
+    max_drawdown: float
     max_drawdown_start: date
     max_drawdown_end: date
 
@@ -143,116 +146,197 @@ def parse_date(value: str, label: str) -> date:
         raise argparse.ArgumentTypeError(f"{label}必须是YYYY-MM-DD格式: {value}") from exc
 
 
-def fetch_adjusted_prices(symbols: Sequence[str], start_date: date, end_date: date) -> Dict[str, Dict[date, Decimal]]:
+@dataclass(frozen=True)
+class PricePanel:
+    """全部标的共享的价格面板：dates 升序，prices[行=日期, 列=标的]，缺失为 NaN。"""
+
+    dates: List[date]
+    symbol_index: Dict[str, int]
+    prices: np.ndarray
+
+
+# COPY ... (FORMAT binary) 的定长行：字段数 int16，之后每个字段为 int32 长度 + 值（均为大端）。
+# 标的以列下标（int4）传回，使每行都是 30 字节，可由 np.frombuffer 一次解析。
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_PRICE_ROW_DTYPE = np.dtype(
+    [
+        ("field_count", ">i2"),
+        ("col_len", ">i4"),
+        ("col", ">i4"),
+        ("day_len", ">i4"),
+        ("day", ">i4"),
+        ("price_len", ">i4"),
+        ("price", ">f8"),
+    ]
+)
+# 签名 11 字节 + flags int32 + 头扩展长度 int32。
+_COPY_HEADER_SIZE = len(_COPY_SIGNATURE) + 8
+_PG_EPOCH = date(2000, 1, 1)
+
+
+def fetch_adjusted_prices(symbols: Sequence[str], start_date: date, end_date: date) -> PricePanel:
     query = """
-        SELECT symbol, trade_date, adjusted_close
-        FROM mart_daily_quotes
-        WHERE symbol = ANY(%s)
-          AND trade_date BETWEEN %s AND %s
-        ORDER BY trade_date
+        COPY (
+            SELECT (array_position(%s::text[], symbol::text) - 1)::int4,
+                   trade_date,
+                   adjusted_close::float8
+            FROM mart_daily_quotes
+            WHERE symbol = ANY(%s)
+              AND trade_date BETWEEN %s AND %s
+              AND adjusted_close IS NOT NULL
+        ) TO STDOUT WITH (FORMAT binary)
     """
-    price_map: Dict[str, Dict[date, Decimal]] = {sym: {} for sym in symbols}
+    symbol_list = list(symbols)
+    buffer = io.BytesIO()
     with get_cursor() as cur:
-        cur.execute(query, (list(symbols), start_date, end_date))
-        for symbol, trade_date, adj_close in cur.fetchall():
-            if adj_close is None:
-                continue
-            price_map[symbol][trade_date] = Decimal(adj_close)
-    missing = [sym for sym, rows in price_map.items() if not rows]
+        statement = cur.mogrify(query, (symbol_list, symbol_list, start_date, end_date)).decode()
+        cur.copy_expert(statement, buffer)
+    records = _parse_price_copy(buffer.getvalue())
+
+    cols = records["col"].astype(np.intp)
+    counts = np.bincount(cols, minlength=len(symbol_list))
+    missing = [sym for col, sym in enumerate(symbol_list) if counts[col] == 0]
     if missing:
         raise RuntimeError(f"以下标的在区间内没有价格数据: {', '.join(missing)}")
-    return price_map
 
+    days, rows = np.unique(records["day"], return_inverse=True)
+    prices = np.full((len(days), len(symbol_list)), np.nan)
+    prices[rows, cols] = records["price"]
+    return PricePanel(
+        dates=[_PG_EPOCH + timedelta(days=int(day)) for day in days],
+        symbol_index={sym: col for col, sym in enumerate(symbol_list)},
+        prices=prices,
+    )
 
-def _first_available_date(rows: Dict[date, Decimal], start: date, end: date) -> date:
-    candidates = [dt for dt in rows.keys() if start <= dt <= end]
-    if not candidates:
-        raise RuntimeError("所选区间内没有可用交易日")
-    return min(candidates)
+
+def _parse_price_copy(payload: bytes) -> np.ndarray:
+    if len(payload) < _COPY_HEADER_SIZE or payload[: len(_COPY_SIGNATURE)] != _COPY_SIGNATURE:
+        raise RuntimeError("无法识别的 COPY 二进制输出")
+    header_end = _COPY_HEADER_SIZE + int.from_bytes(payload[15:19], "big")
+    # 末尾 2 字节为结束标记（字段数 -1）。
+    if len(payload) < header_end + 2 or payload[-2:] != b"\xff\xff":
+        raise RuntimeError("COPY 二进制输出缺少结束标记")
+
+    body_size = len(payload) - header_end - 2
+    if body_size % _PRICE_ROW_DTYPE.itemsize == 0:
+        records = np.frombuffer(
+            payload, dtype=_PRICE_ROW_DTYPE, count=body_size // _PRICE_ROW_DTYPE.itemsize, offset=header_end
+        )
+        # 每行都符合定长布局时按顺序解析的结果就是整块解析的结果；否则（如出现 NULL）逐行解析。
+        if (
+            (records["field_count"] == 3).all()
+            and (records["col_len"] == 4).all()
+            and (records["day_len"] == 4).all()
+            and (records["price_len"] == 8).all()
+        ):
+            return records
+    return _parse_price_copy_rows(payload, header_end)
+
+
+def _parse_price_copy_rows(payload: bytes, offset: int) -> np.ndarray:
+    """逐行解析 COPY 二进制输出；价格为 NULL 时记为 NaN。"""
+    rows: List[Tuple] = []
+    end = len(payload) - 2
+    while offset < end:
+        (field_count,) = struct.unpack_from(">h", payload, offset)
+        offset += 2
+        if field_count != 3:
+            raise RuntimeError(f"COPY 二进制输出字段数异常: {field_count}")
+        values: List[Optional[bytes]] = []
+        for _ in range(3):
+            if offset + 4 > end:
+                raise RuntimeError("COPY 二进制输出长度异常")
+            (length,) = struct.unpack_from(">i", payload, offset)
+            offset += 4
+            if length < 0:
+                values.append(None)
+                continue
+            if offset + length > end:
+                raise RuntimeError("COPY 二进制输出长度异常")
+            values.append(payload[offset : offset + length])
+            offset += length
+        col, day, price = values
+        if col is None or day is None or len(col) != 4 or len(day) != 4:
+            raise RuntimeError("COPY 二进制输出中标的或日期字段异常")
+        if price is not None and len(price) != 8:
+            raise RuntimeError("COPY 二进制输出中价格字段异常")
+        price_value = struct.unpack(">d", price)[0] if price is not None else float("nan")
+        col_value = int.from_bytes(col, "big", signed=True)
+        day_value = int.from_bytes(day, "big", signed=True)
+        rows.append((3, 4, col_value, 4, day_value, 8, price_value))
+    if offset != end:
+        raise RuntimeError("COPY 二进制输出长度异常")
+    return np.array(rows, dtype=_PRICE_ROW_DTYPE)
 
 
 def build_portfolio_series(
     symbols: Sequence[str],
-    price_map: Dict[str, Dict[date, Decimal]],
+    panel: PricePanel,
     start_date: date,
     end_date: date,
 ) -> PortfolioSeries:
-    first_dates: Dict[str, date] = {}
+    cols: List[int] = []
     for sym in symbols:
-        symbol_rows = price_map.get(sym)
-        if not symbol_rows:
+        col = panel.symbol_index.get(sym)
+        if col is None or np.isnan(panel.prices[:, col]).all():
             raise RuntimeError(f"{sym} 在指定区间缺少价格数据")
-        first_dates[sym] = _first_available_date(symbol_rows, start_date, end_date)
+        cols.append(col)
+
+    lo = bisect_left(panel.dates, start_date)
+    hi = bisect_right(panel.dates, end_date)
+    prices = panel.prices[lo:hi, cols]
+    has_price = ~np.isnan(prices)
+    if not has_price.any(axis=0).all():
+        raise RuntimeError("所选区间内没有可用交易日")
 
-    effective_start = max(first_dates.values())
+    first_row = int(has_price.argmax(axis=0).max())
+    effective_start = panel.dates[lo + first_row]
     if effective_start > start_date:
         logging.warning("部分标的缺少起始日收盘价，自动将起点平移到 %s", effective_start)
 
-    relevant_dates = sorted(
-        {
-            dt
-            for sym in symbols
-            for dt in price_map[sym].keys()
-            if effective_start <= dt <= end_date
-        }
-    )
-    if not relevant_dates:
-        raise RuntimeError("未获取到有效交易日，无法计算净值")
-
-    weight = Decimal("1") / Decimal(len(symbols))
-    last_prices: Dict[str, Optional[Decimal]] = {sym: None for sym in symbols}
-    base_prices: Dict[str, Decimal] = {}
-    nav_points: List[Tuple[date, Decimal]] = []
-
-    for dt in relevant_dates:
-        nav = Decimal("0")
-        for sym in symbols:
-            price = price_map[sym].get(dt)
-            if price is not None:
-                last_prices[sym] = price
-            price = last_prices[sym]
-            if price is None:
-                raise RuntimeError(f"{sym} 在 {dt} 缺少可用于前复权的价格")
-            if sym not in base_prices:
-                base_prices[sym] = price
-            nav += weight * (price / base_prices[sym])
-        nav_points.append((dt, nav))
-
-    daily_returns: List[Optional[Decimal]] = []
-    drawdowns: List[Decimal] = []
-    peak_nav = nav_points[0][1]
-    peak_date = nav_points[0][0]
-    max_drawdown = Decimal("0")
-    max_drawdown_start = peak_date
-    max_drawdown_end = peak_date
-    prev_nav: Optional[Decimal] = None
-
-    for dt, nav in nav_points:
-        if prev_nav is None:
-            daily_returns.append(None)
-        else:
-            daily_returns.append(nav / prev_nav - Decimal("1"))
-        if nav > peak_nav:
-            peak_nav = nav
-            peak_date = dt
-        drawdown = nav / peak_nav - Decimal("1")
-        drawdowns.append(drawdown)
-        if drawdown < max_drawdown:
-            max_drawdown = drawdown
-            max_drawdown_start = peak_date
-            max_drawdown_end = dt
-        prev_nav = nav
+    # 只保留组合内至少一只标的有报价的交易日。
+    row_mask = has_price[first_row:].any(axis=1)
+    prices = prices[first_row:][row_mask]
+    relevant_dates = [dt for dt, keep in zip(panel.dates[lo + first_row : hi], row_mask) if keep]
+
+    prices = _forward_fill(prices)
+
+    missing_cols = np.flatnonzero(np.isnan(prices[0]))
+    if missing_cols.size:
+        raise RuntimeError(f"{symbols[missing_cols[0]]} 在 {relevant_dates[0]} 缺少可用于前复权的价格")
+
+    nav = (prices / prices[0]).mean(axis=1)
+    drawdowns = nav / np.maximum.accumulate(nav) - 1.0
+
+    # 最大回撤取首次出现的最低点，起点为此前首次达到的净值高点。
+    end_idx = int(np.argmin(drawdowns))
+    if drawdowns[end_idx] < 0:
+        start_idx = int(np.argmax(nav[: end_idx + 1]))
+        max_drawdown = float(drawdowns[end_idx])
+    else:
+        start_idx = end_idx = 0
+        max_drawdown = 0.0
+
+    daily_returns: List[Optional[float]] = [None]
+    daily_returns.extend((nav[1:] / nav[:-1] - 1.0).tolist())
 
     return PortfolioSeries(
-        nav_points=nav_points,
+        nav_points=list(zip(relevant_dates, nav.tolist())),
         daily_returns=daily_returns,
-        drawdowns=drawdowns,
+        drawdowns=drawdowns.tolist(),
         max_drawdown=max_drawdown,
-        max_drawdown_start=max_drawdown_start,
-        max_drawdown_end=max_drawdown_end,
+        max_drawdown_start=relevant_dates[start_idx],
+        max_drawdown_end=relevant_dates[end_idx],
     )
 
 
+def _forward_fill(prices: np.ndarray) -> np.ndarray:
+    rows = np.arange(prices.shape[0])[:, None]
+    last_valid = np.where(np.isnan(prices), 0, rows)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    return prices[last_valid, np.arange(prices.shape[1])]
+
+
 def compute_summary(
     definition: PortfolioDefinition,
     series: PortfolioSeries,
@@ -266,12 +350,17 @@ def compute_summary(
     cumulative_return = nav_end - 1.0
     holding_days = max((end_dt - start_dt).days, 1)
     growth_ratio = nav_end / nav_start if nav_start else 0.0
-    annualized_return = math.pow(growth_ratio, 365.25 / holding_days) - 1 if growth_ratio > 0 else 0.0
-    daily_return_values = [float(ret) for ret in series.daily_returns if ret is not None]
-    if len(daily_return_values) > 1:
-        daily_vol = pstdev(daily_return_values)
+    # expm1(log(g) * k) 在 g 接近 1 时比 pow(g, k) - 1 更精确。
+    annualized_return = (
+        float(np.expm1(np.log(growth_ratio) * 365.25 / holding_days)) if growth_ratio > 0 else 0.0
+    )
+    daily_return_values = np.array(
+        [float(ret) for ret in series.daily_returns if ret is not None], dtype=np.float64
+    )
+    if daily_return_values.size > 1:
+        daily_vol = float(np.std(daily_return_values))
     else:
-        daily_vol = abs(daily_return_values[0]) if daily_return_values else 0.0
+        daily_vol = abs(float(daily_return_values[0])) if daily_return_values.size else 0.0
     annualized_volatility = daily_vol * math.sqrt(252)
     max_drawdown = float(series.max_drawdown)
     excess_return = annualized_return - risk_free_rate
@@ -353,44 +442,38 @@ def write_summary_csv(path: Path, summaries: Sequence[PortfolioSummary]) -> None
         "calmar_ratio",
     ]
     with path.open("w", newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for summary in summaries:
-            writer.writerow(
-                {
-                    "key": summary.key,
-                    "label": summary.label,
-                    "start_date": summary.start_date.isoformat(),
-                    "end_date": summary.end_date.isoformat(),
-                    "trading_days": summary.trading_days,
-                    "cumulative_return": summary.cumulative_return,
-                    "annualized_return": summary.annualized_return,
-                    "annualized_volatility": summary.annualized_volatility,
-                    "max_drawdown": summary.max_drawdown,
-                    "max_drawdown_start": summary.max_drawdown_start.isoformat(),
-                    "max_drawdown_end": summary.max_drawdown_end.isoformat(),
-                    "sharpe_ratio": summary.sharpe_ratio if summary.sharpe_ratio is not None else "",
-                    "calmar_ratio": summary.calmar_ratio if summary.calmar_ratio is not None else "",
-                }
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        writer.writerows(
+            (
+                summary.key,
+                summary.label,
+                summary.start_date.isoformat(),
+                summary.end_date.isoformat(),
+                summary.trading_days,
+                summary.cumulative_return,
+                summary.annualized_return,
+                summary.annualized_volatility,
+                summary.max_drawdown,
+                summary.max_drawdown_start.isoformat(),
+                summary.max_drawdown_end.isoformat(),
+                summary.sharpe_ratio if summary.sharpe_ratio is not None else "",
+                summary.calmar_ratio if summary.calmar_ratio is not None else "",
             )
+            for summary in summaries
+        )
 
 
-def write_nav_csv(path: Path, portfolio_key: str, series: PortfolioSeries) -> None:
+def write_nav_csv(path: Path, nav_outputs: Sequence[Tuple[str, PortfolioSeries]]) -> None:
     fieldnames = ["portfolio", "trade_date", "nav", "daily_return", "drawdown"]
-    mode = "w" if not path.exists() else "a"
-    with path.open(mode, newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        if mode == "w":
-            writer.writeheader()
-        for (dt, nav), daily_ret, drawdown in zip(series.nav_points, series.daily_returns, series.drawdowns):
-            writer.writerow(
-                {
-                    "portfolio": portfolio_key,
-                    "trade_date": dt.isoformat(),
-                    "nav": float(nav),
-                    "daily_return": float(daily_ret) if daily_ret is not None else "",
-                    "drawdown": float(drawdown),
-                }
+    with path.open("w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        # 所有组合共用一个文件句柄；序列已是 float，daily_return 首行为 None，csv 写出为空串。
+        for portfolio_key, series in nav_outputs:
+            writer.writerows(
+                (portfolio_key, dt.isoformat(), nav, daily_ret, drawdown)
+                for (dt, nav), daily_ret, drawdown in zip(series.nav_points, series.daily_returns, series.drawdowns)
             )
 
 
@@ -403,14 +486,14 @@ def main() -> None:
         raise ValueError("结束日期必须晚于起始日期")
     selected_defs = [PORTFOLIOS[key] for key in args.portfolios]
     all_symbols: List[str] = sorted({sym for definition in selected_defs for sym in definition.symbols})
-    price_map = fetch_adjusted_prices(all_symbols, start_date, end_date)
+    panel = fetch_adjusted_prices(all_symbols, start_date, end_date)
 
     summaries: List[PortfolioSummary] = []
     nav_outputs: Dict[str, PortfolioSeries] = {}
 
     for definition in selected_defs:
         logging.info("开始回测组合：%s", definition.label)
-        series = build_portfolio_series(definition.symbols, price_map, start_date, end_date)
+        series = build_portfolio_series(definition.symbols, panel, start_date, end_date)
         nav_outputs[definition.key] = series
         summary = compute_summary(definition, series, args.risk_free_rate)
         summaries.append(summary)
@@ -426,10 +509,7 @@ def main() -> None:
     if args.nav_csv:
         nav_path = Path(args.nav_csv)
         nav_path.parent.mkdir(parents=True, exist_ok=True)
-        if nav_path.exists():
-            nav_path.unlink()
-        for definition in selected_defs:
-            write_nav_csv(nav_path, definition.key, nav_outputs[definition.key])
+        write_nav_csv(nav_path, [(definition.key, nav_outputs[definition.key]) for definition in selected_defs])
         logging.info("净值明细已输出到 %s", nav_path)
 
 
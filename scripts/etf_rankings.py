@@ -6,9 +6,8 @@ import logging
 import math
 from dataclasses import dataclass
 from datetime import date
-from decimal import Decimal
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence
 
 from .db import get_cursor
 
@@ -26,153 +25,139 @@ class EtfPerformance:
     start_date: date
     end_date: date
     holding_days: int
-    total_return: Decimal
-    annualized_return: Decimal
+    total_return: float
+    annualized_return: float
 
 
+# 多个窗口共用一次查询：windows 由 unnest 展开各窗口参数，上市首日与最新交易日取自
+# mv_symbol_price_coverage（见 config/sql/mv_symbol_price_coverage.sql），symbol_windows 只对合格标的
+# 聚合各窗口内首个有效交易日与有效交易日数，起止价格再按 (symbol, trade_date) 回表取值。
 PERIOD_QUERY = """
 WITH latest AS (
-    SELECT max(mdq.trade_date) AS latest_date
-    FROM mart_daily_quotes mdq
-    JOIN dim_symbol ds ON ds.symbol = mdq.symbol
+    SELECT max(cov.last_trade_date) AS latest_date
+    FROM mv_symbol_price_coverage cov
+    JOIN dim_symbol ds ON ds.symbol = cov.symbol
     WHERE ds.asset_type = 'ETF'
       AND ds.is_active
 ),
-thresholds AS (
-    SELECT latest_date,
-           (latest_date - make_interval(years => %(window_years)s))::date AS start_cut
-    FROM latest
-),
-eligibility AS (
-    SELECT latest_date,
-           (latest_date - make_interval(years => %(min_years)s))::date AS min_required_date
-    FROM latest
+windows AS (
+    SELECT w.window_years,
+           w.min_coverage_days,
+           w.min_trading_days,
+           l.latest_date,
+           (l.latest_date - make_interval(years => w.window_years))::date AS start_cut,
+           (l.latest_date - make_interval(years => %(min_years)s))::date AS min_required_date
+    FROM unnest(
+             %(window_years)s::int[],
+             %(min_coverage_days)s::int[],
+             %(min_trading_days)s::int[]
+         ) AS w(window_years, min_coverage_days, min_trading_days)
+    CROSS JOIN latest l
 ),
+-- 上市时间门槛直接查覆盖度物化视图，只有合格标的才去扫描窗口内的日线。
 eligible_symbols AS (
-    SELECT mdq.symbol
-    FROM mart_daily_quotes mdq
-    JOIN dim_symbol ds ON ds.symbol = mdq.symbol
-    JOIN eligibility e ON true
-    JOIN thresholds t ON true
+    SELECT w.window_years,
+           cov.symbol
+    FROM mv_symbol_price_coverage cov
+    JOIN dim_symbol ds ON ds.symbol = cov.symbol
+    CROSS JOIN windows w
     WHERE ds.asset_type = 'ETF'
       AND ds.is_active
-      AND NOT EXISTS (
+      AND cov.first_trade_date <= w.min_required_date + make_interval(days => %(fudge_days)s)
+      AND cov.total_days >= w.min_trading_days
+),
+symbol_windows AS (
+    SELECT es.window_years,
+           es.symbol,
+           min(mdq.trade_date) AS start_date,
+           COUNT(*) AS trading_days
+    FROM eligible_symbols es
+    JOIN windows w ON w.window_years = es.window_years
+    JOIN mart_daily_quotes mdq
+      ON mdq.symbol = es.symbol
+     AND mdq.trade_date BETWEEN w.start_cut AND w.latest_date
+     AND mdq.adjusted_close IS NOT NULL
+    GROUP BY es.window_years, es.symbol
+),
+calc AS (
+    SELECT sw.window_years,
+           sw.symbol,
+           sp.trade_date AS start_date,
+           ep.trade_date AS end_date,
+           sw.trading_days,
+           ep.adjusted_close / sp.adjusted_close - 1 AS total_return,
+           power((ep.adjusted_close / sp.adjusted_close)::numeric,
+                 (365.25 / GREATEST(1, (ep.trade_date - sp.trade_date)))::numeric) - 1 AS annualized_return,
+           ep.trade_date - sp.trade_date AS holding_days
+    FROM symbol_windows sw
+    JOIN windows w ON w.window_years = sw.window_years
+    JOIN mart_daily_quotes sp ON sp.symbol = sw.symbol AND sp.trade_date = sw.start_date
+    JOIN mart_daily_quotes ep ON ep.symbol = sw.symbol AND ep.trade_date = w.latest_date
+    WHERE NOT EXISTS (
           SELECT 1
           FROM fact_corporate_actions fca
-          WHERE fca.symbol = mdq.symbol
+          WHERE fca.symbol = sw.symbol
             AND fca.action_type = 'split'
             AND fca.value < 1
-            AND fca.action_date >= t.start_cut - make_interval(days => %(fudge_days)s)
+            AND fca.action_date >= w.start_cut - make_interval(days => %(fudge_days)s)
       )
-    GROUP BY mdq.symbol
-    HAVING min(mdq.trade_date) <= min(e.min_required_date) + make_interval(days => %(fudge_days)s)
-),
-start_prices AS (
-    SELECT DISTINCT ON (mdq.symbol) mdq.symbol,
-           mdq.trade_date AS start_date,
-           mdq.adjusted_close AS start_price
-    FROM mart_daily_quotes mdq
-    JOIN dim_symbol ds ON ds.symbol = mdq.symbol
-    JOIN eligible_symbols es ON es.symbol = mdq.symbol
-    JOIN thresholds t ON true
-    WHERE ds.asset_type = 'ETF'
-      AND ds.is_active
-      AND mdq.adjusted_close IS NOT NULL
-      AND mdq.trade_date >= t.start_cut
-    ORDER BY mdq.symbol, mdq.trade_date
-),
-end_prices AS (
-    SELECT mdq.symbol,
-           mdq.trade_date AS end_date,
-           mdq.adjusted_close AS end_price
-    FROM mart_daily_quotes mdq
-    JOIN eligible_symbols es ON es.symbol = mdq.symbol
-    JOIN latest l ON l.latest_date = mdq.trade_date
-),
-coverage AS (
-    SELECT mdq.symbol,
-           COUNT(*) FILTER (
-               WHERE mdq.trade_date BETWEEN t.start_cut AND l.latest_date
-                 AND mdq.adjusted_close IS NOT NULL
-           ) AS trading_days
-    FROM mart_daily_quotes mdq
-    JOIN eligible_symbols es ON es.symbol = mdq.symbol
-    JOIN thresholds t ON true
-    JOIN latest l ON true
-    GROUP BY mdq.symbol
-),
-calc AS (
-    SELECT sp.symbol,
-           sp.start_date,
-           ep.end_date,
-           sp.start_price,
-           ep.end_price,
-           ep.end_price / sp.start_price - 1 AS total_return,
-           power((ep.end_price / sp.start_price)::numeric,
-                 (365.25 / GREATEST(1, (ep.end_date - sp.start_date)))::numeric) - 1 AS annualized_return,
-           ep.end_date - sp.start_date AS holding_days
-    FROM start_prices sp
-    JOIN end_prices ep ON ep.symbol = sp.symbol
-    WHERE ep.end_price > 0
-      AND sp.start_price > 0
+      AND ep.adjusted_close > 0
+      AND sp.adjusted_close > 0
 )
-SELECT c.symbol,
+SELECT c.window_years,
+       c.symbol,
        ds.name,
        c.start_date,
        c.end_date,
        c.holding_days,
-       c.total_return,
-       c.annualized_return
+       c.total_return::float8,
+       c.annualized_return::float8
 FROM calc c
 JOIN dim_symbol ds ON ds.symbol = c.symbol
-JOIN thresholds t ON true
-JOIN coverage cov ON cov.symbol = c.symbol
-WHERE c.end_date = t.latest_date
-  AND c.start_date <= t.start_cut + make_interval(days => %(fudge_days)s)
-  AND c.holding_days >= %(min_coverage_days)s
-  AND cov.trading_days >= %(min_trading_days)s
-ORDER BY c.total_return DESC;
+JOIN windows w ON w.window_years = c.window_years
+WHERE c.start_date <= w.start_cut + make_interval(days => %(fudge_days)s)
+  AND c.holding_days >= w.min_coverage_days
+  AND c.trading_days >= w.min_trading_days
+ORDER BY c.window_years, c.total_return DESC;
 """
 
 
-def fetch_period_performance(
-    window_years: int,
+def fetch_period_performances(
+    window_years: Sequence[int],
     fudge_days: int,
     min_years: int,
     min_coverage_ratio: float,
-) -> List[EtfPerformance]:
-    min_coverage_days = max(window_years * 365 - fudge_days, 1)
-    calendar_days = window_years * 365
-    min_trading_days = max(math.ceil(calendar_days * min_coverage_ratio), 1)
+) -> Dict[int, List[EtfPerformance]]:
+    windows = list(dict.fromkeys(window_years))
     params = {
-        "window_years": window_years,
+        "window_years": windows,
+        "min_coverage_days": [max(years * 365 - fudge_days, 1) for years in windows],
+        "min_trading_days": [max(math.ceil(years * 365 * min_coverage_ratio), 1) for years in windows],
         "fudge_days": fudge_days,
         "min_years": min_years,
-        "min_coverage_days": min_coverage_days,
-        "min_trading_days": min_trading_days,
     }
     with get_cursor() as cur:
         cur.execute(PERIOD_QUERY, params)
         rows = cur.fetchall()
 
-    performances: List[EtfPerformance] = []
+    performances: Dict[int, List[EtfPerformance]] = {years: [] for years in windows}
     for row in rows:
-        performances.append(
+        performances[row[0]].append(
             EtfPerformance(
-                symbol=row[0],
-                name=row[1],
-                start_date=row[2],
-                end_date=row[3],
-                holding_days=row[4],
-                total_return=row[5],
-                annualized_return=row[6],
+                symbol=row[1],
+                name=row[2],
+                start_date=row[3],
+                end_date=row[4],
+                holding_days=row[5],
+                total_return=row[6],
+                annualized_return=row[7],
             )
         )
     return performances
 
 
-def format_percent(value: Decimal) -> str:
-    return f"{(value * Decimal('100')):,.2f}%"
+def format_percent(value: float) -> str:
+    return f"{value * 100:,.2f}%"
 
 
 def limit_items(items: List[EtfPerformance], limit: Optional[int]) -> List[EtfPerformance]:
@@ -188,15 +173,16 @@ def print_rankings(title: str, items: List[EtfPerformance], limit: Optional[int]
     print(headers)
     print("-" * len(headers))
 
+    # 先拼好全部行再一次性输出，数百行时不再逐行 print。
     limited = limit_items(items, limit)
-    for idx, perf in enumerate(limited, start=1):
-        name_display = perf.name[:40]
-        print(
-            f"{idx:>4}  {perf.symbol:<12}  {name_display:<40}  "
-            f"{perf.start_date:%Y-%m-%d}  {perf.end_date:%Y-%m-%d}  "
-            f"{format_percent(perf.total_return):>12}  {format_percent(perf.annualized_return):>12}"
-        )
-    print(f"共 {len(items)} 条记录")
+    lines = [
+        f"{idx:>4}  {perf.symbol:<12}  {perf.name[:40]:<40}  "
+        f"{perf.start_date:%Y-%m-%d}  {perf.end_date:%Y-%m-%d}  "
+        f"{format_percent(perf.total_return):>12}  {format_percent(perf.annualized_return):>12}"
+        for idx, perf in enumerate(limited, start=1)
+    ]
+    lines.append(f"共 {len(items)} 条记录")
+    print("\n".join(lines))
 
 
 def print_overlap(overlap: Iterable[Dict[str, EtfPerformance]], limit: Optional[int]) -> None:
@@ -211,28 +197,22 @@ def print_overlap(overlap: Iterable[Dict[str, EtfPerformance]], limit: Optional[
     print("-" * len(headers))
 
     limited = limit_items(data, limit)
-    for idx, record in enumerate(limited, start=1):
-        perf5 = record["5y"]
-        perf10 = record["10y"]
-        name_display = perf5.name[:40]
-        print(
-            f"{idx:>4}  {perf5.symbol:<12}  {name_display:<40}  "
-            f"{format_percent(perf5.total_return):>12}  {format_percent(perf5.annualized_return):>12}  "
-            f"{format_percent(perf10.total_return):>12}  {format_percent(perf10.annualized_return):>12}"
-        )
-    print(f"共 {len(data)} 条记录")
+    lines = [
+        f"{idx:>4}  {perf5.symbol:<12}  {perf5.name[:40]:<40}  "
+        f"{format_percent(perf5.total_return):>12}  {format_percent(perf5.annualized_return):>12}  "
+        f"{format_percent(perf10.total_return):>12}  {format_percent(perf10.annualized_return):>12}"
+        for idx, (perf5, perf10) in enumerate(((record["5y"], record["10y"]) for record in limited), start=1)
+    ]
+    lines.append(f"共 {len(data)} 条记录")
+    print("\n".join(lines))
 
 
 def build_overlap(
     perf_5y: List[EtfPerformance], perf_10y: List[EtfPerformance]
 ) -> List[Dict[str, EtfPerformance]]:
+    # perf_5y 已按 5 年累计收益降序，按其顺序过滤即保持排名，无需再排序。
     lookup_10y: Dict[str, EtfPerformance] = {item.symbol: item for item in perf_10y}
-    overlap: List[Dict[str, EtfPerformance]] = []
-    for item in perf_5y:
-        match = lookup_10y.get(item.symbol)
-        if match is not None:
-            overlap.append({"5y": item, "10y": match})
-    return overlap
+    return [{"5y": item, "10y": lookup_10y[item.symbol]} for item in perf_5y if item.symbol in lookup_10y]
 
 
 def parse_args() -> argparse.Namespace:
@@ -293,21 +273,21 @@ def write_rankings_csv(path: Path, items: List[EtfPerformance]) -> None:
         "annualized_return",
     ]
     with path.open("w", newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for idx, perf in enumerate(items, start=1):
-            writer.writerow(
-                {
-                    "rank": idx,
-                    "symbol": perf.symbol,
-                    "name": perf.name,
-                    "start_date": perf.start_date.isoformat(),
-                    "end_date": perf.end_date.isoformat(),
-                    "holding_days": perf.holding_days,
-                    "total_return": f"{perf.total_return}",
-                    "annualized_return": f"{perf.annualized_return}",
-                }
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        writer.writerows(
+            (
+                idx,
+                perf.symbol,
+                perf.name,
+                perf.start_date.isoformat(),
+                perf.end_date.isoformat(),
+                perf.holding_days,
+                perf.total_return,
+                perf.annualized_return,
             )
+            for idx, perf in enumerate(items, start=1)
+        )
 
 
 def write_overlap_csv(path: Path, records: List[Dict[str, EtfPerformance]]) -> None:
@@ -327,28 +307,26 @@ def write_overlap_csv(path: Path, records: List[Dict[str, EtfPerformance]]) -> N
         "annualized_return_10y",
     ]
     with path.open("w", newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for idx, record in enumerate(records, start=1):
-            perf5 = record["5y"]
-            perf10 = record["10y"]
-            writer.writerow(
-                {
-                    "rank": idx,
-                    "symbol": perf5.symbol,
-                    "name": perf5.name,
-                    "start_date_5y": perf5.start_date.isoformat(),
-                    "end_date_5y": perf5.end_date.isoformat(),
-                    "holding_days_5y": perf5.holding_days,
-                    "total_return_5y": f"{perf5.total_return}",
-                    "annualized_return_5y": f"{perf5.annualized_return}",
-                    "start_date_10y": perf10.start_date.isoformat(),
-                    "end_date_10y": perf10.end_date.isoformat(),
-                    "holding_days_10y": perf10.holding_days,
-                    "total_return_10y": f"{perf10.total_return}",
-                    "annualized_return_10y": f"{perf10.annualized_return}",
-                }
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        writer.writerows(
+            (
+                idx,
+                record["5y"].symbol,
+                record["5y"].name,
+                record["5y"].start_date.isoformat(),
+                record["5y"].end_date.isoformat(),
+                record["5y"].holding_days,
+                record["5y"].total_return,
+                record["5y"].annualized_return,
+                record["10y"].start_date.isoformat(),
+                record["10y"].end_date.isoformat(),
+                record["10y"].holding_days,
+                record["10y"].total_return,
+                record["10y"].annualized_return,
             )
+            for idx, record in enumerate(records, start=1)
+        )
 
 
 def main() -> None:
@@ -356,20 +334,15 @@ def main() -> None:
     logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
     LOGGER.info("开始生成ETF收益榜单，允许偏差天数：%s", args.fudge_days)
 
-    perf_5y = fetch_period_performance(
-        window_years=5,
+    performances = fetch_period_performances(
+        window_years=(5, 10),
         fudge_days=args.fudge_days,
         min_years=10,
         min_coverage_ratio=MIN_TRADING_DAY_RATIO,
     )
+    perf_5y = performances[5]
+    perf_10y = performances[10]
     LOGGER.info("5年窗口覆盖ETF数量：%s", len(perf_5y))
-
-    perf_10y = fetch_period_performance(
-        window_years=10,
-        fudge_days=args.fudge_days,
-        min_years=10,
-        min_coverage_ratio=MIN_TRADING_DAY_RATIO,
-    )
     LOGGER.info("10年窗口覆盖ETF数量：%s", len(perf_10y))
 
     top_counts = resolve_top_args(args)
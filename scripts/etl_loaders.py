@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import csv
+import io
 import json
 import logging
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
+from psycopg2 import errors as pg_errors
 from psycopg2.extras import execute_values
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 from .utils import (
     canonical_symbol,
     derive_shares_from_payload,
@@ -19,6 +27,13 @@ from .utils import (
 LOGGER = logging.getLogger(__name__)
 
 
+def _dumps_payload(payload: Any) -> str:
+    # 基本面 payload 每条数 KB，orjson 序列化快数倍；写入 jsonb 后格式差异（空格）不影响存储结果。
+    if orjson is not None:
+        return orjson.dumps(payload, default=str).decode()
+    return json.dumps(payload, default=str)
+
+
 def _coerce_date(value: Union[str, date, None]) -> Optional[date]:
     if value is None:
         return None
@@ -27,14 +42,43 @@ def _coerce_date(value: Union[str, date, None]) -> Optional[date]:
     return datetime.fromisoformat(value).date()
 
 
-def upsert_symbol(cur, symbol: str, payload: Dict[str, Any]) -> str:
+# 基本面 payload 每条数 KB，按千行一页拼接，兼顾往返次数与单条语句大小。
+FUNDAMENTALS_PAGE_SIZE = 1000
+
+
+def _symbol_row(symbol: str, payload: Dict[str, Any]) -> Tuple:
     general = payload.get("General", {})
     sector, industry = normalize_sector_industry(general)
-    stored_symbol = canonical_symbol(symbol, general)
-    cur.execute(
+    return (
+        canonical_symbol(symbol, general),
+        general.get("Name"),
+        general.get("Exchange"),
+        general.get("Type"),
+        sector,
+        industry,
+    )
+
+
+def upsert_symbol(cur, symbol: str, payload: Dict[str, Any]) -> str:
+    return upsert_symbols_bulk(cur, {symbol: payload})[0]
+
+
+def upsert_symbols_bulk(cur, payloads: Mapping[str, Dict[str, Any]]) -> List[str]:
+    """批量写入 dim_symbol，返回与 payloads 顺序一致的入库代码。"""
+    # 不同请求代码可能归一到同一入库代码，同一条 INSERT 内重复会触发 ON CONFLICT 报错，保留最后一条。
+    rows: Dict[str, Tuple] = {}
+    stored_symbols: List[str] = []
+    for symbol, payload in payloads.items():
+        row = _symbol_row(symbol, payload)
+        rows[row[0]] = row
+        stored_symbols.append(row[0])
+    if not rows:
+        return stored_symbols
+    execute_values(
+        cur,
         """
         INSERT INTO dim_symbol (symbol, name, exchange, asset_type, sector, industry, is_active, updated_at)
-        VALUES (%s,%s,%s,%s,%s,%s,true,now())
+        VALUES %s
         ON CONFLICT (symbol)
         DO UPDATE SET name = EXCLUDED.name,
                       exchange = EXCLUDED.exchange,
@@ -43,69 +87,103 @@ def upsert_symbol(cur, symbol: str, payload: Dict[str, Any]) -> str:
                       industry = EXCLUDED.industry,
                       updated_at = now();
         """,
-        (
-            stored_symbol,
-            general.get("Name"),
-            general.get("Exchange"),
-            general.get("Type"),
-            sector,
-            industry,
-        ),
+        list(rows.values()),
+        template="(%s,%s,%s,%s,%s,%s,true,now())",
+        page_size=FUNDAMENTALS_PAGE_SIZE,
     )
-    return stored_symbol
+    return stored_symbols
 
 
-def upsert_fundamentals(cur, symbol: str, payload: Dict[str, Any]) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+def _fundamentals_row(symbol: str, payload: Dict[str, Any], now_ts: datetime) -> Tuple:
     general = payload.get("General", {})
     highlights = payload.get("Highlights", {})
     valuation = payload.get("Valuation", {})
 
     shares_outstanding, shares_float = derive_shares_from_payload(payload)
 
+    # 缺失或无法解析的 UpdatedAt 统一落在本批次的写入时间上。
+    updated_at_dt = now_ts
     updated_at_raw = general.get("UpdatedAt")
     if updated_at_raw:
         try:
             updated_at_dt = datetime.fromisoformat(updated_at_raw.replace("Z", "+00:00"))
         except ValueError:
-            updated_at_dt = datetime.now(timezone.utc)
-    else:
-        updated_at_dt = datetime.now(timezone.utc)
+            pass
+
+    return (
+        symbol,
+        general.get("FiscalYearEnd"),
+        shares_outstanding,
+        shares_float,
+        highlights.get("MarketCapitalization"),
+        highlights.get("PERatio"),
+        valuation.get("PriceBookMRQ"),
+        valuation.get("PriceSalesTTM"),
+        highlights.get("DividendYield"),
+        highlights.get("DividendShare"),
+        updated_at_dt,
+        _dumps_payload(payload),
+    )
 
-    cur.execute(
+
+def _insert_fundamentals(cur, rows: Sequence[Tuple]) -> None:
+    if not rows:
+        return
+    execute_values(
+        cur,
         """
         INSERT INTO stg_fundamentals (
             symbol, "FiscalYearEnd", "SharesOutstanding", "SharesFloat", "MarketCapitalization",
             "PERatio", "PriceBookMRQ", "PriceSalesTTM", "DividendYield", "DividendShare",
             "UpdatedAt", "Payload"
         )
-        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+        VALUES %s
         ON CONFLICT (symbol, "UpdatedAt") DO NOTHING;
         """,
-        (
-            symbol,
-            general.get("FiscalYearEnd"),
-            shares_outstanding,
-            shares_float,
-            highlights.get("MarketCapitalization"),
-            highlights.get("PERatio"),
-            valuation.get("PriceBookMRQ"),
-            valuation.get("PriceSalesTTM"),
-            highlights.get("DividendYield"),
-            highlights.get("DividendShare"),
-            updated_at_dt,
-            json.dumps(payload),
-        ),
+        rows,
+        page_size=FUNDAMENTALS_PAGE_SIZE,
     )
 
-    return shares_outstanding, shares_float
 
+def upsert_fundamentals(cur, symbol: str, payload: Dict[str, Any]) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+    row = _fundamentals_row(symbol, payload, datetime.now(timezone.utc))
+    _insert_fundamentals(cur, [row])
+    return row[2], row[3]
 
-def upsert_eod_quotes(cur, symbol: str, rows: Sequence[Dict[str, Any]]) -> None:
-    values: List[Tuple] = []
+
+def upsert_fundamentals_bulk(cur, payloads: Mapping[str, Dict[str, Any]]) -> None:
+    """按入库代码批量写入 stg_fundamentals 快照。"""
     now_ts = datetime.now(timezone.utc)
-    for row in rows:
-        values.append(
-            (
+    _insert_fundamentals(cur, [_fundamentals_row(symbol, payload, now_ts) for symbol, payload in payloads.items()])
+
+
+_EOD_UPSERT_SET = """
+    open = EXCLUDED.open,
+    high = EXCLUDED.high,
+    low = EXCLUDED.low,
+    close = EXCLUDED.close,
+    adjusted_close = EXCLUDED.adjusted_close,
+    volume = EXCLUDED.volume,
+    updated_at = now()
+"""
+
+# execute_values 默认每 100 行一个往返；行情与拆股每行只有几十字节，一页发完即可。
+PAGE_SIZE = 10_000
+
+# 历史回填或日更整批写入时行数可达数千，走 COPY 到临时表再合并；只有零星几行时 COPY 的额外往返反而更慢。
+COPY_MIN_ROWS = 500
+
+
+def upsert_eod_quotes(cur, symbol: str, rows: Sequence[Dict[str, Any]]) -> None:
+    upsert_eod_quotes_bulk(cur, {symbol: rows})
+
+
+def upsert_eod_quotes_bulk(cur, quotes: Mapping[str, Sequence[Dict[str, Any]]]) -> None:
+    # 同一 (symbol, date) 在一条 INSERT 中出现两次会触发 ON CONFLICT 报错，这里保留最后一条。
+    records: Dict[Tuple[str, Any], Tuple] = {}
+    for symbol, rows in quotes.items():
+        for row in rows:
+            records[(symbol, row.get("date"))] = (
                 symbol,
                 row.get("date"),
                 row.get("open"),
@@ -114,56 +192,84 @@ def upsert_eod_quotes(cur, symbol: str, rows: Sequence[Dict[str, Any]]) -> None:
                 row.get("close"),
                 row.get("adjusted_close"),
                 row.get("volume"),
-                now_ts,
             )
-        )
-    if not values:
+    if not records:
+        return
+    if len(records) >= COPY_MIN_ROWS:
+        _copy_upsert_eod_quotes(cur, records.values())
         return
+
     execute_values(
         cur,
-        """
+        f"""
         INSERT INTO stg_eod_quotes (symbol, date, open, high, low, close, adjusted_close, volume, updated_at)
         VALUES %s
-        ON CONFLICT (symbol, date) DO UPDATE SET
-            open = EXCLUDED.open,
-            high = EXCLUDED.high,
-            low = EXCLUDED.low,
-            close = EXCLUDED.close,
-            adjusted_close = EXCLUDED.adjusted_close,
-            volume = EXCLUDED.volume,
-            updated_at = now();
+        ON CONFLICT (symbol, date) DO UPDATE SET {_EOD_UPSERT_SET};
         """,
-        values,
+        list(records.values()),
+        template="(%s,%s,%s,%s,%s,%s,%s,%s,now())",
+        page_size=PAGE_SIZE,
+    )
+
+
+def _copy_upsert_eod_quotes(cur, records: Iterable[Tuple]) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(records)
+    buffer.seek(0)
+
+    # volume 先按 numeric 接收，插入时再转 bigint，与 VALUES 写入时的隐式转换一致。
+    cur.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS tmp_eod_quotes (
+            symbol         TEXT,
+            date           DATE,
+            open           NUMERIC,
+            high           NUMERIC,
+            low            NUMERIC,
+            close          NUMERIC,
+            adjusted_close NUMERIC,
+            volume         NUMERIC
+        ) ON COMMIT DELETE ROWS;
+        """
+    )
+    cur.copy_expert(
+        "COPY tmp_eod_quotes (symbol, date, open, high, low, close, adjusted_close, volume) "
+        "FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+    cur.execute(
+        f"""
+        INSERT INTO stg_eod_quotes (symbol, date, open, high, low, close, adjusted_close, volume, updated_at)
+        SELECT symbol, date, open, high, low, close, adjusted_close, volume, now()
+        FROM tmp_eod_quotes
+        ON CONFLICT (symbol, date) DO UPDATE SET {_EOD_UPSERT_SET};
+        TRUNCATE tmp_eod_quotes;
+        """
     )
 
 
 def upsert_dividends(cur, symbol: str, rows: Sequence[Dict[str, Any]]) -> None:
     if not rows:
         return
-    now_ts = datetime.now(timezone.utc)
-    execute_values(
-        cur,
+    # 整批只序列化一次，由服务端 jsonb_array_elements 展开成行，省去逐行构造参数与序列化。
+    cur.execute(
         """
         INSERT INTO fact_corporate_actions (symbol, action_date, action_type, value, currency, source_payload, updated_at)
-        VALUES %s
+        SELECT %s,
+               (elem->>'date')::date,
+               'dividend',
+               (elem->>'value')::numeric,
+               elem->>'currency',
+               elem,
+               now()
+        FROM jsonb_array_elements(%s::jsonb) AS elem
         ON CONFLICT (symbol, action_date, action_type) DO UPDATE SET
             value = EXCLUDED.value,
             currency = EXCLUDED.currency,
             source_payload = EXCLUDED.source_payload,
             updated_at = now();
         """,
-        [
-            (
-                symbol,
-                row.get("date"),
-                "dividend",
-                row.get("value"),
-                row.get("currency"),
-                json.dumps(row),
-                now_ts,
-            )
-            for row in rows
-        ],
+        (symbol, _dumps_payload(list(rows))),
     )
 
 
@@ -172,7 +278,6 @@ def upsert_splits(cur, symbol: str, rows: Sequence[Dict[str, Any]]) -> None:
         return
 
     prepared: List[Tuple] = []
-    now_ts = datetime.now(timezone.utc)
     for row in rows:
         ratio = parse_split_ratio(row.get("ratio") or row.get("split") or row.get("value"))
         prepared.append(
@@ -182,8 +287,7 @@ def upsert_splits(cur, symbol: str, rows: Sequence[Dict[str, Any]]) -> None:
                 "split",
                 ratio,
                 row.get("to_symbol") or row.get("description"),
-                json.dumps(row),
-                now_ts,
+                _dumps_payload(row),
             )
         )
 
@@ -199,6 +303,8 @@ def upsert_splits(cur, symbol: str, rows: Sequence[Dict[str, Any]]) -> None:
             updated_at = now();
         """,
         prepared,
+        template="(%s,%s,%s,%s,%s,%s,now())",
+        page_size=PAGE_SIZE,
     )
 
 
@@ -218,7 +324,7 @@ def refresh_mart_daily_quotes(cur, symbols: Sequence[str], start_date: str, end_
                    "DividendShare",
                    ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY "UpdatedAt" DESC) AS rn
             FROM stg_fundamentals
-            WHERE symbol = ANY(%s)
+            WHERE symbol = ANY(%(symbols)s)
         ),
         fund AS (
             SELECT symbol,
@@ -231,6 +337,18 @@ def refresh_mart_daily_quotes(cur, symbols: Sequence[str], start_date: str, end_
                    "DividendShare"
             FROM latest_fund WHERE rn = 1
         ),
+        -- 分红与拆股按 (symbol, date) 先合并成一行，daily 只需一次 LEFT JOIN。
+        actions AS (
+            SELECT symbol,
+                   action_date,
+                   MAX(value) FILTER (WHERE action_type = 'dividend') AS dividend,
+                   MAX(value) FILTER (WHERE action_type = 'split') AS split_factor
+            FROM fact_corporate_actions
+            WHERE symbol = ANY(%(symbols)s)
+              AND action_date BETWEEN %(start_date)s AND %(end_date)s
+              AND action_type IN ('dividend', 'split')
+            GROUP BY symbol, action_date
+        ),
         daily AS (
             SELECT q.symbol,
                    q.date AS trade_date,
@@ -240,10 +358,14 @@ def refresh_mart_daily_quotes(cur, symbols: Sequence[str], start_date: str, end_
                    q.close,
                    q.adjusted_close,
                    q.volume,
-                   COALESCE(div.value, 0) AS dividend,
-                   COALESCE(split.value, 1) AS split_factor,
-                   LAG(q.close) OVER (PARTITION BY q.symbol ORDER BY q.date) AS pre_close,
-                   AVG(q.volume) OVER (PARTITION BY q.symbol ORDER BY q.date ROWS BETWEEN 5 PRECEDING AND 1 PRECEDING) AS avg_volume_5,
+                   COALESCE(a.dividend, 0) AS dividend,
+                   COALESCE(a.split_factor, 1) AS split_factor,
+                   LAG(q.close) OVER w AS pre_close,
+                   AVG(q.volume) OVER (w ROWS BETWEEN 5 PRECEDING AND 1 PRECEDING) AS avg_volume_5,
+                   LAG(q.adjusted_close, 5) OVER w AS adj_close_5,
+                   LAG(q.adjusted_close, 10) OVER w AS adj_close_10,
+                   LAG(q.adjusted_close, 20) OVER w AS adj_close_20,
+                   LAG(q.adjusted_close, 60) OVER w AS adj_close_60,
                    f."SharesOutstanding",
                    f."SharesFloat",
                    f."PERatio",
@@ -252,17 +374,14 @@ def refresh_mart_daily_quotes(cur, symbols: Sequence[str], start_date: str, end_
                    f."DividendYield",
                    f."DividendShare"
             FROM stg_eod_quotes q
-            LEFT JOIN fact_corporate_actions div
-              ON div.symbol = q.symbol
-             AND div.action_date = q.date
-             AND div.action_type = 'dividend'
-            LEFT JOIN fact_corporate_actions split
-              ON split.symbol = q.symbol
-             AND split.action_date = q.date
-             AND split.action_type = 'split'
+            LEFT JOIN actions a
+              ON a.symbol = q.symbol
+             AND a.action_date = q.date
             LEFT JOIN fund f ON f.symbol = q.symbol
-            WHERE q.symbol = ANY(%s)
-              AND q.date BETWEEN %s AND %s
+            WHERE q.symbol = ANY(%(symbols)s)
+              AND q.date BETWEEN %(start_date)s AND %(end_date)s
+            -- 各 LAG 在同一命名窗口上只算一次，外层按列名引用。
+            WINDOW w AS (PARTITION BY q.symbol ORDER BY q.date)
         )
         INSERT INTO mart_daily_quotes (
             symbol, trade_date, open, high, low, close, adjusted_close, volume,
@@ -330,39 +449,35 @@ def refresh_mart_daily_quotes(cur, symbols: Sequence[str], start_date: str, end_
             CASE WHEN d."SharesOutstanding" IS NOT NULL THEN d.close * d."SharesOutstanding" ELSE NULL END AS total_mv,
             CASE WHEN d."SharesFloat" IS NOT NULL THEN d.close * d."SharesFloat" ELSE NULL END AS circ_mv,
             CASE
-                WHEN LAG(d.adjusted_close,5) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) IS NULL
-                     OR LAG(d.adjusted_close,5) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) = 0 THEN NULL
+                WHEN d.adj_close_5 IS NULL OR d.adj_close_5 = 0 THEN NULL
                 ELSE
                     CASE
-                        WHEN ABS(d.adjusted_close / LAG(d.adjusted_close,5) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) - 1) >= 10000 THEN NULL
-                        ELSE d.adjusted_close / LAG(d.adjusted_close,5) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) - 1
+                        WHEN ABS(d.adjusted_close / d.adj_close_5 - 1) >= 10000 THEN NULL
+                        ELSE d.adjusted_close / d.adj_close_5 - 1
                     END
             END AS pct_chg_5d,
             CASE
-                WHEN LAG(d.adjusted_close,10) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) IS NULL
-                     OR LAG(d.adjusted_close,10) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) = 0 THEN NULL
+                WHEN d.adj_close_10 IS NULL OR d.adj_close_10 = 0 THEN NULL
                 ELSE
                     CASE
-                        WHEN ABS(d.adjusted_close / LAG(d.adjusted_close,10) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) - 1) >= 10000 THEN NULL
-                        ELSE d.adjusted_close / LAG(d.adjusted_close,10) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) - 1
+                        WHEN ABS(d.adjusted_close / d.adj_close_10 - 1) >= 10000 THEN NULL
+                        ELSE d.adjusted_close / d.adj_close_10 - 1
                     END
             END AS pct_chg_10d,
             CASE
-                WHEN LAG(d.adjusted_close,20) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) IS NULL
-                     OR LAG(d.adjusted_close,20) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) = 0 THEN NULL
+                WHEN d.adj_close_20 IS NULL OR d.adj_close_20 = 0 THEN NULL
                 ELSE
                     CASE
-                        WHEN ABS(d.adjusted_close / LAG(d.adjusted_close,20) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) - 1) >= 10000 THEN NULL
-                        ELSE d.adjusted_close / LAG(d.adjusted_close,20) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) - 1
+                        WHEN ABS(d.adjusted_close / d.adj_close_20 - 1) >= 10000 THEN NULL
+                        ELSE d.adjusted_close / d.adj_close_20 - 1
                     END
             END AS pct_chg_20d,
             CASE
-                WHEN LAG(d.adjusted_close,60) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) IS NULL
-                     OR LAG(d.adjusted_close,60) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) = 0 THEN NULL
+                WHEN d.adj_close_60 IS NULL OR d.adj_close_60 = 0 THEN NULL
                 ELSE
                     CASE
-                        WHEN ABS(d.adjusted_close / LAG(d.adjusted_close,60) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) - 1) >= 10000 THEN NULL
-                        ELSE d.adjusted_close / LAG(d.adjusted_close,60) OVER (PARTITION BY d.symbol ORDER BY d.trade_date) - 1
+                        WHEN ABS(d.adjusted_close / d.adj_close_60 - 1) >= 10000 THEN NULL
+                        ELSE d.adjusted_close / d.adj_close_60 - 1
                     END
             END AS pct_chg_60d,
             now(),
@@ -401,7 +516,8 @@ def refresh_mart_daily_quotes(cur, symbols: Sequence[str], start_date: str, end_
             pct_chg_60d=EXCLUDED.pct_chg_60d,
             updated_at=now();
         """,
-        (list(symbols), list(symbols), start_date, end_date),
+        # 命名参数：同一符号列表只适配一次，三处过滤共用。
+        {"symbols": list(symbols), "start_date": start_date, "end_date": end_date},
     )
 
 
@@ -426,6 +542,64 @@ def refresh_etf_periodic_returns(
     )
 
 
+def _refresh_optional(cur, migration: str, query: str, params: Optional[Sequence[Any]] = None) -> None:
+    """刷新只服务于 API/报表的派生表；对应迁移脚本尚未执行时告警跳过，不回滚同一事务里的基础数据写入。"""
+    cur.execute("SAVEPOINT refresh_optional;")
+    try:
+        cur.execute(query, params)
+    except (pg_errors.UndefinedFunction, pg_errors.UndefinedTable) as exc:
+        cur.execute("ROLLBACK TO SAVEPOINT refresh_optional;")
+        LOGGER.warning("Skipping refresh, run %s first: %s", migration, exc.diag.message_primary)
+        return
+    cur.execute("RELEASE SAVEPOINT refresh_optional;")
+
+
+def refresh_daily_quotes_bucketed(
+    cur,
+    symbols: Sequence[str],
+    start_date: Union[str, date, None],
+    end_date: Union[str, date, None],
+) -> None:
+    if not symbols:
+        return
+
+    unique_symbols = list(dict.fromkeys(symbols))
+    start_dt = _coerce_date(start_date)
+    end_dt = _coerce_date(end_date)
+
+    _refresh_optional(
+        cur,
+        "config/sql/mart_daily_quotes_bucketed.sql",
+        """
+        SELECT refresh_mart_daily_quotes_bucketed(%s, %s, %s);
+        """,
+        (unique_symbols, start_dt, end_dt),
+    )
+
+
+def refresh_industry_groups(cur) -> None:
+    _refresh_optional(cur, "config/sql/mart_industry_groups.sql", "SELECT refresh_mart_industry_groups();")
+
+
+def refresh_symbol_price_coverage(cur) -> None:
+    _refresh_optional(
+        cur,
+        "config/sql/mv_symbol_price_coverage.sql",
+        "REFRESH MATERIALIZED VIEW CONCURRENTLY mv_symbol_price_coverage;",
+    )
+
+
+_NULL_METRIC_COLUMNS = (
+    "symbol",
+    "total_rows",
+    "null_turnover",
+    "null_volume_ratio",
+    "null_total_share",
+    "min_date",
+    "max_date",
+)
+
+
 def log_null_metrics(cur, symbols: Sequence[str]) -> List[Dict[str, Any]]:
     cur.execute(
         """
@@ -442,18 +616,9 @@ def log_null_metrics(cur, symbols: Sequence[str]) -> List[Dict[str, Any]]:
         """,
         (list(symbols),),
     )
-    rows = cur.fetchall()
     result = []
-    for row in rows:
-        entry = {
-            "symbol": row[0],
-            "total_rows": row[1],
-            "null_turnover": row[2],
-            "null_volume_ratio": row[3],
-            "null_total_share": row[4],
-            "min_date": row[5],
-            "max_date": row[6],
-        }
+    for row in cur:
+        entry = dict(zip(_NULL_METRIC_COLUMNS, row))
         allowed_null_volume = min(1, entry["total_rows"])
         volume_warn = entry["null_volume_ratio"] > allowed_null_volume
         turnover_warn = entry["null_turnover"] > entry["total_rows"] * 0.2  # arbitrary threshold
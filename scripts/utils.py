@@ -52,21 +52,27 @@ def parse_split_ratio(raw_value: Any) -> Optional[Decimal]:
 
 def _extract_latest_from_collection(collection: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     try:
-        sorted_items = sorted(
-            (
-                (int(item["date"]) if item["date"].isdigit() else item["date"], item)
-                for item in collection.values()
-                if isinstance(item, dict) and item.get("shares")
-            ),
-            reverse=True,
+        # 只需最新一条，单次 max 即可，无需整体排序。
+        return max(
+            (item for item in collection.values() if isinstance(item, dict) and item.get("shares")),
+            key=lambda item: int(item["date"]) if item["date"].isdigit() else item["date"],
+            default=None,
         )
-        if sorted_items:
-            return sorted_items[0][1]
     except Exception as exc:  # pragma: no cover
         LOGGER.warning("Failed to extract latest shares from collection: %s", exc)
     return None
 
 
+def _to_decimal(value: Any) -> Optional[Decimal]:
+    if value in (None, "", "0"):
+        return None
+    try:
+        # 经 str 转换，避免 float 按二进制展开成长尾小数。
+        return Decimal(str(value))
+    except Exception:  # pragma: no cover
+        return None
+
+
 def derive_shares_from_payload(payload: Dict[str, Any]) -> Tuple[Optional[Decimal], Optional[Decimal]]:
     """
     Derive SharesOutstanding and SharesFloat numbers.
@@ -81,16 +87,8 @@ def derive_shares_from_payload(payload: Dict[str, Any]) -> Tuple[Optional[Decima
     outstanding_value = shares_stats.get("SharesOutstanding")
     float_value = shares_stats.get("SharesFloat")
 
-    def to_decimal(value: Any) -> Optional[Decimal]:
-        if value in (None, "", "0"):
-            return None
-        try:
-            return Decimal(str(value))
-        except Exception:  # pragma: no cover
-            return None
-
-    shares_outstanding = to_decimal(outstanding_value)
-    shares_float = to_decimal(float_value)
+    shares_outstanding = _to_decimal(outstanding_value)
+    shares_float = _to_decimal(float_value)
 
     if shares_outstanding is None and outstanding:
         annual = outstanding.get("annual") or {}
@@ -99,9 +97,10 @@ def derive_shares_from_payload(payload: Dict[str, Any]) -> Tuple[Optional[Decima
             quarterly = outstanding.get("quarterly") or {}
             latest = _extract_latest_from_collection(quarterly)
         if latest and latest.get("shares"):
-            shares_outstanding = to_decimal(latest["shares"])
+            shares_outstanding = _to_decimal(latest["shares"])
         if latest and latest.get("sharesMln") and shares_outstanding is None:
-            shares_outstanding = to_decimal(Decimal(latest["sharesMln"]) * Decimal("1_000_000"))
+            # scaleb 只调整指数即乘以 10^6；经 str 转换，float 不会展开成二进制长尾小数。
+            shares_outstanding = Decimal(str(latest["sharesMln"])).scaleb(6)
 
     if shares_float is None:
         # As a fallback, assume float equals outstanding when no dedicated value.
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+import requests
+from tenacity import RetryError
+
+from scripts.api_client import EODHDClient, RateLimited, _parse_retry_after
+
+
+class _FakeResponse:
+    def __init__(self, status_code, headers=None, payload=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._payload = payload
+        self.content = json.dumps(payload).encode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error", response=self)
+
+    def json(self):
+        return self._payload
+
+
+class _FakeSession:
+    def __init__(self, responses):
+        self._responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        response = self._responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    monkeypatch.setenv("EODHD_API_TOKEN", "test")
+    recorded = []
+    monkeypatch.setattr(EODHDClient.get.retry, "sleep", recorded.append)
+    return recorded
+
+
+def _client(responses):
+    session = _FakeSession(responses)
+    return EODHDClient(session=session), session
+
+
+def test_rate_limited_waits_retry_after(sleeps) -> None:
+    client, session = _client([_FakeResponse(429, {"Retry-After": "2"}), _FakeResponse(200, payload={"ok": 1})])
+
+    assert client.get("/eod/AAA.US") == {"ok": 1}
+    assert session.calls == 2
+    assert sleeps == [2.0]
+
+
+def test_server_error_uses_exponential_jitter(sleeps) -> None:
+    responses = [_FakeResponse(500), requests.ConnectionError("reset"), _FakeResponse(503), _FakeResponse(200, payload=[])]
+    client, session = _client(responses)
+
+    assert client.get("/eod/AAA.US") == []
+    assert session.calls == 4
+    assert len(sleeps) == 3
+    # initial=0.5 指数退避 + [0, 1) 抖动，上限 8 秒。
+    for attempt, wait in enumerate(sleeps):
+        base = 0.5 * 2**attempt
+        assert base <= wait <= min(base + 1, 8)
+
+
+def test_client_error_is_not_retried(sleeps) -> None:
+    client, session = _client([_FakeResponse(404)])
+
+    with pytest.raises(requests.HTTPError):
+        client.get("/fundamentals/MISSING.US")
+    assert session.calls == 1
+    assert sleeps == []
+
+
+def test_rate_limited_stops_after_five_attempts(sleeps) -> None:
+    client, session = _client([_FakeResponse(429, {"Retry-After": "1"}) for _ in range(5)])
+
+    with pytest.raises(RetryError) as excinfo:
+        client.get("/eod/AAA.US")
+    assert isinstance(excinfo.value.last_attempt.exception(), RateLimited)
+    assert session.calls == 5
+    assert sleeps == [1.0] * 4
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("3", 3.0), ("0.5", 0.5), ("-1", 0.0), (None, 1.0), ("", 1.0), ("Wed, 21 Oct 2015 07:28:00 GMT", 1.0)],
+)
+def test_parse_retry_after(value, expected) -> None:
+    assert _parse_retry_after(value) == expected
@@ -0,0 +1,32 @@
+import os
+import warnings
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def app():
+    # api.config 在导入时读取数据库配置；路由注册检查不连接数据库，占位值即可。
+    for name in ("PGHOST", "PGDATABASE", "PGUSER", "PGPASSWORD"):
+        os.environ.setdefault(name, "placeholder")
+
+    from api.main import app
+
+    return app
+
+
+def test_api_routes_registered_once(app) -> None:
+    # 同一 handler 被重复注册时，生成 OpenAPI 会给出 "Duplicate Operation ID" 警告。
+    app.openapi_schema = None
+    with warnings.catch_warnings():
+        warnings.filterwarnings("error", message="Duplicate Operation ID")
+        schema = app.openapi()
+
+    assert set(schema["paths"]) == {
+        "/api/etfs/{symbol}/returns",
+        "/api/etfs/{symbol}/performance",
+        "/api/etfs/{symbol}/stats",
+        "/api/industries",
+        "/healthz",
+        "/readyz",
+    }
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from scripts import auto_backfill
+from scripts.auto_backfill import ProgressWriter, process_queue
+
+
+@pytest.fixture
+def saves(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(
+        auto_backfill,
+        "save_progress",
+        lambda path, data: recorded.append({key: dict(value) for key, value in data.items()}),
+    )
+    return recorded
+
+
+def test_process_queue_out_of_order_completion(monkeypatch, tmp_path, saves) -> None:
+    symbols = ["A.US", "B.US", "C.US", "D.US"]
+    completed = set()
+    lock = threading.Lock()
+    release_first = threading.Event()
+
+    def fake_process(client, symbol, start_date, end_date, sleep_seconds):
+        # A 在 B 完成并记录进度之后才结束，制造乱序完成。
+        if symbol == "A.US":
+            assert release_first.wait(timeout=5)
+        if symbol == "C.US":
+            raise RuntimeError("boom")
+        with lock:
+            completed.add(symbol)
+
+    observed = []
+    original_mark_dirty = ProgressWriter.mark_dirty
+
+    def spy_mark_dirty(self):
+        with lock:
+            observed.append((entry["next_index"], set(completed)))
+        release_first.set()
+        original_mark_dirty(self)
+
+    monkeypatch.setattr(auto_backfill, "_process_and_pause", fake_process)
+    monkeypatch.setattr(ProgressWriter, "mark_dirty", spy_mark_dirty)
+
+    entry = {"exchange": "US", "next_index": 0, "error_count": 0}
+    store = {"US": entry}
+    failed = {}
+    process_queue(
+        None, symbols, 0, "2024-01-01", "2024-01-31", 0, failed, entry, tmp_path / "p.json", store, 0, concurrency=2
+    )
+
+    # B 先完成时 A 尚未完成，next_index 不能越过 A。
+    assert observed[0] == (0, {"B.US"})
+    for next_index, done in observed:
+        assert all(symbols[idx] in done or symbols[idx] == "C.US" for idx in range(next_index))
+    assert entry["next_index"] == 4
+    assert entry["error_count"] == 1
+    assert set(failed) == {"C.US"}
+    # 更新次数不足 25 次且未超过 10 秒，只在退出时写入一次。
+    assert len(saves) == 1
+    assert saves[0]["US"]["next_index"] == 4
+
+
+def test_progress_writer_flush_triggers(monkeypatch, tmp_path, saves) -> None:
+    clock = [100.0]
+    monkeypatch.setattr(auto_backfill.time, "monotonic", lambda: clock[0])
+    data = {"US": {"next_index": 0}}
+
+    with ProgressWriter(tmp_path / "p.json", data) as writer:
+        for _ in range(24):
+            writer.mark_dirty()
+        assert saves == []
+        writer.mark_dirty()
+        assert len(saves) == 1
+
+        clock[0] += 9.9
+        writer.mark_dirty()
+        assert len(saves) == 1
+        clock[0] += 0.1
+        writer.mark_dirty()
+        assert len(saves) == 2
+
+        data["US"]["next_index"] = 7
+        writer.mark_dirty()
+    assert len(saves) == 3
+    assert saves[-1]["US"]["next_index"] == 7
@@ -1,16 +1,32 @@
+import math
+import struct
 from datetime import date
 from decimal import Decimal
 
+import numpy as np
 import pytest
 
 from scripts.etf_backtest import (
     PortfolioDefinition,
     PortfolioSeries,
+    PricePanel,
+    _parse_price_copy,
     build_portfolio_series,
     compute_summary,
 )
 
 
+def _price_panel(price_map) -> PricePanel:
+    dates = sorted({dt for rows in price_map.values() for dt in rows})
+    row_index = {dt: row for row, dt in enumerate(dates)}
+    symbol_index = {sym: col for col, sym in enumerate(price_map)}
+    prices = np.full((len(dates), len(symbol_index)), np.nan)
+    for sym, rows in price_map.items():
+        for dt, price in rows.items():
+            prices[row_index[dt], symbol_index[sym]] = float(price)
+    return PricePanel(dates=dates, symbol_index=symbol_index, prices=prices)
+
+
 def test_build_portfolio_series_equal_weight() -> None:
     start = date(2020, 11, 3)
     end = date(2020, 11, 5)
@@ -27,7 +43,7 @@ def test_build_portfolio_series_equal_weight() -> None:
         },
     }
 
-    series = build_portfolio_series(("AAA.US", "BBB.US"), price_map, start, end)
+    series = build_portfolio_series(("AAA.US", "BBB.US"), _price_panel(price_map), start, end)
 
     nav_values = [float(nav) for _, nav in series.nav_points]
     assert nav_values == pytest.approx([1.0, 1.025, 1.1275], rel=1e-6)
@@ -63,3 +79,40 @@ def test_compute_summary_metrics() -> None:
     assert summary.max_drawdown == pytest.approx(float(drawdown_value), rel=1e-6)
     assert summary.sharpe_ratio == pytest.approx(0.0, abs=1e-9)
     assert summary.calmar_ratio == pytest.approx(0.0, abs=1e-9)
+
+
+def _copy_payload(rows) -> bytes:
+    payload = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+    for col, day, price in rows:
+        payload += struct.pack(">hiiii", 3, 4, col, 4, day)
+        payload += struct.pack(">i", -1) if price is None else struct.pack(">id", 8, price)
+    return payload + b"\xff\xff"
+
+
+def test_parse_price_copy_fixed_rows() -> None:
+    records = _parse_price_copy(_copy_payload([(0, 7612, 100.5), (1, 7613, 200.25)]))
+
+    assert records["col"].tolist() == [0, 1]
+    assert records["day"].tolist() == [7612, 7613]
+    assert records["price"].tolist() == [100.5, 200.25]
+
+
+def test_parse_price_copy_null_price() -> None:
+    records = _parse_price_copy(_copy_payload([(0, 7612, 100.5), (1, 7612, None), (0, 7613, 101.0)]))
+
+    assert records["col"].tolist() == [0, 1, 0]
+    assert records["day"].tolist() == [7612, 7612, 7613]
+    assert records["price"][0] == 100.5
+    assert math.isnan(records["price"][1])
+    assert records["price"][2] == 101.0
+
+
+def test_parse_price_copy_rejects_malformed_payload() -> None:
+    payload = _copy_payload([(0, 7612, 100.5)])
+
+    with pytest.raises(RuntimeError):
+        _parse_price_copy(b"NOTCOPY" + payload[7:])
+    with pytest.raises(RuntimeError):
+        _parse_price_copy(payload[:-2])
+    with pytest.raises(RuntimeError):
+        _parse_price_copy(payload[:-6] + b"\xff\xff")
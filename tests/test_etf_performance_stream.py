@@ -0,0 +1,121 @@
+import json
+import os
+from contextlib import asynccontextmanager
+from datetime import date
+
+import pytest
+
+
+class _FakeConnection:
+    def __init__(self, database):
+        self._database = database
+        self._rows = database.rows
+
+    @asynccontextmanager
+    async def transaction(self, readonly=False):
+        yield
+
+    async def _iterate(self):
+        for row in self._rows:
+            yield row
+
+    def cursor(self, query, *args, prefetch=None):
+        self._database.queries += 1
+        return self._iterate()
+
+
+class _FakeDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+        self.acquired = 0
+        self.released = 0
+
+    @asynccontextmanager
+    async def acquire(self):
+        self.acquired += 1
+        try:
+            yield _FakeConnection(self)
+        finally:
+            self.released += 1
+
+
+@pytest.fixture(scope="module")
+def client():
+    for name in ("PGHOST", "PGDATABASE", "PGUSER", "PGPASSWORD"):
+        os.environ.setdefault(name, "placeholder")
+
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    # 不进入 lifespan，不连接数据库与 Redis。
+    return TestClient(app)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    from api.routers import etfs
+
+    def install(rows):
+        fake = _FakeDatabase(rows)
+        monkeypatch.setattr(etfs, "db", fake)
+        return fake
+
+    return install
+
+
+def _get_ndjson(client):
+    from api.config import settings
+
+    return client.get(
+        "/api/etfs/QQQ.US/performance",
+        params={"benchmark": "SPY.US"},
+        headers={"Accept": "application/x-ndjson", "X-API-Token": settings.api_auth_token or ""},
+    )
+
+
+def test_performance_ndjson_lines(client, fake_db) -> None:
+    fake = fake_db(
+        [
+            {"bucket_date": date(2024, 1, 2), "etf_close": 100.0, "benchmark_close": 50.0},
+            {"bucket_date": date(2024, 1, 3), "etf_close": 0.0, "benchmark_close": 51.0},
+            {"bucket_date": date(2024, 1, 4), "etf_close": 110.0, "benchmark_close": 55.0},
+        ]
+    )
+
+    response = _get_ndjson(client)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"symbol": "QQQ.US", "benchmark": "SPY.US", "interval": "day"}
+    # 价格非正的行被跳过。
+    assert [line["date"] for line in lines[1:]] == ["2024-01-02", "2024-01-04"]
+    assert lines[1]["etfValue"] == pytest.approx(1.0)
+    assert lines[2]["etfValue"] == pytest.approx(1.1)
+    assert lines[2]["benchmarkValue"] == pytest.approx(1.1)
+    assert lines[2]["spreadPct"] == pytest.approx(0.0)
+    # 首行校验与流式输出共用同一游标，查询只执行一次。
+    assert fake.queries == 1
+    assert fake.acquired == fake.released == 1
+
+
+def test_performance_ndjson_empty_returns_404(client, fake_db) -> None:
+    fake = fake_db([])
+
+    response = _get_ndjson(client)
+
+    assert response.status_code == 404
+    assert fake.queries == 1
+    assert fake.acquired == fake.released == 1
+
+
+def test_performance_ndjson_non_positive_first_price_returns_400(client, fake_db) -> None:
+    fake = fake_db([{"bucket_date": date(2024, 1, 2), "etf_close": 0.0, "benchmark_close": 50.0}])
+
+    response = _get_ndjson(client)
+
+    assert response.status_code == 400
+    assert fake.queries == 1
+    assert fake.acquired == fake.released == 1